@@ -0,0 +1,233 @@
+from functools import lru_cache, partial
+from typing import Literal
+
+import dspy
+
+from utils.llm_async import acall_with_backoff
+from utils.llm_cache import CacheMissError
+from utils.metrics import record
+from utils.prompt_context import ContextBuffer
+from utils.spatial_map import SpatialMap
+
+INSTRUCTIONS = """
+You are an intelligent agent exploring a house to guess the profession of the resident.
+
+Your job is to determine the likely profession of the room's occupant
+(one of: professor, assassin, student, billionaire), **but only after gathering enough evidence**.
+
+Associate the profession with the objects you see. (think about what objects might each profession have)
+
+Your goal is to guess the profession of the occupant based on observed items.
+{cot}
+Confidence is from 0 to 10:
+- 10 = Absolute certainty.
+- 0 = No idea.
+
+If you're confident enough and can justify your guess based on seen objects, you may stop.
+{hints}"""
+
+COT_INSTRUCTIONS = """
+At each step:
+- Analyze your current observation.
+- Consider all previously seen object descriptions.
+- Think step-by-step to decide on the most informative next action.
+- If confident enough, predict the profession and explain your reasoning.
+"""
+
+
+class ExploreAndGuess(dspy.Signature):
+    observation: str = dspy.InputField(desc="Current visible environment description.")
+    seen_descriptions: str = dspy.InputField(desc="Descriptions of discovered objects so far.")
+    admissible_commands: list[str] = dspy.InputField(desc="Available actions to choose from.")
+
+    action: str = dspy.OutputField(desc="Most useful next action to explore.")
+    prediction: Literal['professor', 'assassin', 'student', 'billionaire'] = dspy.OutputField(
+        desc="Best guess of profession so far.", default="unknown"
+    )
+    confidence: float = dspy.OutputField(
+        desc="Confidence in prediction (0 to 10).", default=0.0
+    )
+    stop: bool = dspy.OutputField(
+        desc="Should exploration stop (True if confident)?", default=False
+    )
+
+
+class Memory:
+    """Chronological OBSERVED/ACTION log of the episode, fed to the prompt as `memory`."""
+
+    field = "memory"
+    metric = "memory_chars"
+    desc = "Chronological memory of previous actions and observations."
+    hint = None
+
+    def __init__(self, max_entries=40):
+        self.buffer = ContextBuffer(max_entries=max_entries)
+
+    def render(self):
+        return self.buffer.render()
+
+    def after_step(self, observation, action):
+        self.buffer.append(f"OBSERVED: {observation}")
+        self.buffer.append(f"ACTION: {action}")
+
+    def update(self, observation, action=None):
+        pass
+
+    def reset(self):
+        self.buffer.clear()
+
+
+class Map:
+    """SpatialMap of the room's receptacles, fed to the prompt as `local_map`."""
+
+    field = "local_map"
+    metric = "map_chars"
+    desc = "Known map of opened/unopened containers."
+    hint = "Use a local map of explored/unexplored places to choose your next action more wisely."
+
+    def __init__(self):
+        self.world_map = SpatialMap()
+
+    def render(self):
+        return self.world_map.render()
+
+    def after_step(self, observation, action):
+        pass
+
+    def update(self, observation, action=None):
+        self.world_map.update(observation, action)
+
+    def reset(self):
+        self.world_map = SpatialMap()
+
+
+# Component combinations whose prompt hint is written for the pair rather than built from the single hints
+COMBINED_HINTS = {
+    frozenset({"memory", "local_map"}): "\nUse history of actions, memory of previous steps, and a local map of opened/closed containers to plan exploration.",
+}
+
+
+@lru_cache(maxsize=None)
+def explore_signature(chain_of_thought, component_types):
+    # One signature per (reasoning mode, context components), built once per process
+    signature = ExploreAndGuess
+    hints = []
+    for component in component_types:
+        signature = signature.append(component.field, dspy.InputField(desc=component.desc), type_=str)
+        if component.hint:
+            hints.append(component.hint)
+    combined = COMBINED_HINTS.get(frozenset(component.field for component in component_types))
+    if combined:
+        hints = [combined]
+    instructions = INSTRUCTIONS.format(cot=COT_INSTRUCTIONS if chain_of_thought else "", hints="\n".join(hints))
+    return signature.with_instructions(instructions.strip())
+
+
+class ExplorerAgent(dspy.Module):
+    """
+    The exploration agent in all its variants: `reasoning` is "predict" or
+    "cot", `components` are any of Memory() / Map() whose rendered text is
+    added to the prompt, `backoff` holds the acall_with_backoff settings of
+    the async path. `reset()` clears per-episode state so an instance can be
+    reused for the next episode.
+    """
+
+    def __init__(self, reasoning="predict", components=(), label="Agent", backoff=None):
+        super().__init__()
+        self.chain_of_thought = reasoning == "cot"
+        self.components = list(components)
+        self.label = label
+        self.backoff = backoff or {}
+        signature = explore_signature(self.chain_of_thought, tuple(type(c) for c in self.components))
+        self.policy = dspy.ChainOfThought(signature) if self.chain_of_thought else dspy.Predict(signature)
+        self.reset()
+
+    def reset(self):
+        for component in self.components:
+            component.reset()
+        # seen_descriptions only ever grows within an episode, so it is joined incrementally
+        self._seen_text = ""
+        self._seen_count = 0
+
+    def forward(self, observation, seen_descriptions, admissible_commands):
+        try:
+            result = self.policy(**self._policy_inputs(observation, seen_descriptions, admissible_commands))
+        except CacheMissError:
+            # A replay must not drift onto the fallback action when a response is missing
+            raise
+        except Exception as e:
+            print(f"⚠️ DSPy error: {e}")
+            return "look around", "unknown", 0.0, False
+
+        return self._handle_result(result, observation)
+
+    async def aforward(self, observation, seen_descriptions, admissible_commands):
+        try:
+            result = await acall_with_backoff(self.policy, **self.backoff, **self._policy_inputs(observation, seen_descriptions, admissible_commands))
+        except CacheMissError:
+            raise
+        except Exception as e:
+            print(f"⚠️ DSPy error: {e}")
+            return "look around", "unknown", 0.0, False
+
+        return self._handle_result(result, observation)
+
+    def _seen(self, seen_descriptions):
+        if len(seen_descriptions) < self._seen_count:
+            self._seen_text, self._seen_count = "", 0
+        new = seen_descriptions[self._seen_count:]
+        if new:
+            self._seen_text = "\n".join([self._seen_text, *new] if self._seen_text else new)
+            self._seen_count = len(seen_descriptions)
+        return self._seen_text
+
+    def _policy_inputs(self, observation, seen_descriptions, admissible_commands):
+        inputs = dict(
+            observation=observation,
+            seen_descriptions=self._seen(seen_descriptions),
+            admissible_commands=admissible_commands
+        )
+        for component in self.components:
+            inputs[component.field] = component.render()
+            record(component.metric, len(inputs[component.field]))
+        return inputs
+
+    def _handle_result(self, result, observation):
+        self.observe_step(observation, result.action)
+
+        if self.chain_of_thought:
+            print(f"\n🧠 [{self.label}] Reasoning:\n", result.reasoning)
+        print(f"\n🤖 [{self.label}] Chose action:", result.action)
+        print(f"🔍 [{self.label}] Prediction:", result.prediction, f"({result.confidence:.2f} confidence)")
+        print(f"🛑 [{self.label}] Wants to stop:", result.stop)
+
+        return result.action, result.prediction, result.confidence, result.stop
+
+    def observe_step(self, observation, action):
+        # Also called by the episode loop for steps whose action came from the planner, not the LLM
+        for component in self.components:
+            component.after_step(observation, action)
+
+    def update_map(self, observation, action=None):
+        for component in self.components:
+            component.update(observation, action)
+
+
+# agent_type -> (reasoning, component factories, log label)
+AGENT_VARIANTS = {
+    "naive": ("predict", (), "Agent"),
+    "memory": ("predict", (partial(Memory, max_entries=40),), "MemoryAgent"),
+    "cot": ("cot", (), "CoT"),
+    "cot_memory": ("cot", (partial(Memory, max_entries=20),), "CoT+Memory"),
+    "naive_map": ("predict", (Map,), "Naive+Map"),
+    "memory_map": ("predict", (partial(Memory, max_entries=40), Map), "Memory+Map"),
+    "cot_map": ("cot", (Map,), "CoT+Map"),
+    "cot_memory_map": ("cot", (partial(Memory, max_entries=20), Map), "CoT+Memory+Map"),
+}
+
+
+def build_agent(agent_type, backoff=None):
+    if agent_type not in AGENT_VARIANTS:
+        raise ValueError(f"Unknown agent_type: {agent_type}")
+    reasoning, factories, label = AGENT_VARIANTS[agent_type]
+    return ExplorerAgent(reasoning, [factory() for factory in factories], label, backoff)
@@ -0,0 +1,271 @@
+"""
+Micro-benchmarks of the per-step episode work that is not the LLM or the simulator.
+
+Run from the repo root:
+
+    python -m benchmarks.hot_path              # run, print and append to results/benchmark_history.jsonl
+    python -m benchmarks.hot_path --compare    # also show the change against the last other commit
+    python -m benchmarks.hot_path -k discovery --no-save
+
+ALFWorld is replaced by ScriptedEnv, which replays canned observations built
+from the eval_attributes files. Prompt assembly benchmarks need DSPy and are
+skipped without it.
+"""
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import timeit
+
+from utils.action_index import ActionIndex
+from utils.command_matcher import ActionSnapper
+from utils.env_pool import strip_task
+from utils.floorplan_index import group_by_floorplan
+from utils.object_index import ObjectIndex, load_object_index
+from utils.prompt_context import ContextBuffer
+from utils.spatial_map import SpatialMap
+
+ATTR_DIR = "eval_attributes"
+HISTORY_PATH = "results/benchmark_history.jsonl"
+RECEPTACLES = ["armchair 1", "bed 1", "cabinet 1", "cabinet 2", "cabinet 3", "desk 1", "drawer 1", "drawer 2",
+               "drawer 3", "dresser 1", "garbagecan 1", "laundryhamper 1", "safe 1", "shelf 1", "shelf 2", "sidetable 1"]
+OPENABLE = ("cabinet", "drawer", "safe")
+AGENT_TYPES = ["naive", "memory", "cot", "cot_memory", "naive_map", "memory_map", "cot_map", "cot_memory_map"]
+
+
+class ScriptedEnv:
+    """
+    Batch-size-1 stand-in for an ALFWorld env: a fixed room whose receptacles
+    hold the objects of one attribute file, answering the usual ALFWorld
+    observation templates for "go to" and "open" and ignoring everything else.
+    """
+
+    def __init__(self, object_names, seed=0):
+        rng = random.Random(seed)
+        self.contents = {r: [] for r in RECEPTACLES}
+        for i, name in enumerate(object_names):
+            self.contents[rng.choice(RECEPTACLES)].append(f"{name.lower()} {i % 3 + 1}")
+        self.opened = set()
+
+    def commands(self):
+        cmds = ["look", "inventory"] + [f"go to {r}" for r in RECEPTACLES]
+        cmds += [f"open {r}" for r in RECEPTACLES if r.startswith(OPENABLE) and r not in self.opened]
+        cmds += [f"examine {r}" for r in RECEPTACLES]
+        return cmds
+
+    def reset(self):
+        self.opened = set()
+        obs = ("-= Welcome to TextWorld, ALFRED! =-\n\nYou are in the middle of a room. Looking quickly around you, you see "
+               + ", ".join(f"a {r}" for r in RECEPTACLES) + ".\n\nYour task is to: guess the profession.")
+        return [obs], {"admissible_commands": [self.commands()]}
+
+    def step(self, actions):
+        action = actions[0]
+        target = action.removeprefix("go to ").removeprefix("open ")
+        items = ", ".join(f"a {item}" for item in self.contents.get(target, [])) or "nothing"
+        if action.startswith("go to ") and target.startswith(OPENABLE) and target not in self.opened:
+            obs = f"You arrive at {target}. The {target} is closed."
+        elif action.startswith("go to "):
+            obs = f"You arrive at {target}. On the {target}, you see {items}."
+        elif action.startswith("open "):
+            self.opened.add(target)
+            obs = f"You open the {target}. The {target} is open. In it, you see {items}."
+        else:
+            obs = "Nothing happens."
+        return [obs], [0], [False], {"admissible_commands": [self.commands()]}
+
+
+def scripted_episode(env, length=30):
+    # The same exploration every time: visit each receptacle, opening the closed ones
+    obs, info = env.reset()
+    steps = [(None, strip_task(obs[0]), info["admissible_commands"][0])]
+    actions = []
+    for r in RECEPTACLES:
+        actions.append(f"go to {r}")
+        if r.startswith(OPENABLE):
+            actions.append(f"open {r}")
+    for action in (actions * 2)[:length]:
+        obs, _, _, info = env.step([action])
+        steps.append((action, obs[0], info["admissible_commands"][0]))
+    return steps
+
+
+def attribute_files():
+    return sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json")))
+
+
+def make_benchmarks():
+    benchmarks = {}
+    files = attribute_files()
+    attributes = {}
+    for path in files:
+        with open(path) as f:
+            attributes[path] = json.load(f)
+    episodes = {path: scripted_episode(ScriptedEnv(attrs)) for path, attrs in attributes.items()}
+
+    def discovery():
+        for path, steps in episodes.items():
+            index = load_object_index(path)
+            seen = {}
+            for _, observation, _ in steps:
+                for key in index.find(observation):
+                    if key not in seen:
+                        seen[key] = index.description(key)
+    benchmarks["object_discovery"] = discovery
+
+    def index_build():
+        for attrs in attributes.values():
+            ObjectIndex(attrs)
+    benchmarks["object_index_build"] = index_build
+
+    # A synthetic floorplan index the size of the ALFWorld train split (about 3.5k games over 30 floorplans)
+    task_types = ["look_at_obj_in_light", "pick_and_place_simple", "pick_clean_then_place_in_recep", "pick_two_obj_and_place"]
+    games = [[f"/data/json_2.1.1/train/{task_types[i % 4]}-Obj{i}-None-Recep-{i % 30 + 1}/trial_T{i}", task_types[i % 4], str(i % 30 + 1)]
+             for i in range(3500)]
+
+    def floorplan_lookup():
+        group_by_floorplan(games, frozenset(task_types[:3])).get("7", [])
+    benchmarks["floorplan_index_lookup"] = floorplan_lookup
+
+    steps = next(iter(episodes.values()))
+    proposals = [action or "look" for action, _, _ in steps]
+
+    def dedup():
+        index = ActionIndex()
+        for (action, _, cmds), proposed in zip(steps, proposals + proposals[:1]):
+            index.choose(proposed, cmds)
+            index.choose(proposed, cmds)
+    benchmarks["action_dedup"] = dedup
+
+    paraphrased = [p.replace("go to ", "walk to the ").replace("open ", "open the ") for p in proposals]
+
+    def snap():
+        snapper = ActionSnapper()
+        for (_, _, cmds), proposed in zip(steps, paraphrased):
+            snapper.snap(proposed, cmds)
+    benchmarks["action_snap"] = snap
+
+    def spatial_map():
+        world_map = SpatialMap()
+        for action, observation, _ in steps:
+            world_map.update(observation, action)
+            world_map.render()
+    benchmarks["spatial_map_update_render"] = spatial_map
+
+    def context_buffer():
+        buffer = ContextBuffer(max_entries=40)
+        for action, observation, _ in steps:
+            buffer.append(f"OBSERVED: {observation}")
+            buffer.append(f"ACTION: {action}")
+            buffer.render()
+    benchmarks["context_buffer_append_render"] = context_buffer
+
+    try:
+        from agents.engine import build_agent
+    except ImportError as e:
+        print(f"⏭️ Skipping prompt assembly benchmarks: {e}")
+        return benchmarks
+    for agent_type in AGENT_TYPES:
+        benchmarks[f"prompt_assembly_{agent_type}"] = make_prompt_assembly(build_agent(agent_type), steps, files[0])
+
+    return benchmarks
+
+
+def make_prompt_assembly(agent, steps, attr_path):
+    def prompt_assembly():
+        agent.reset()
+        index = load_object_index(attr_path)
+        seen = {}
+        for action, observation, cmds in steps:
+            for key in index.find(observation):
+                seen.setdefault(key, index.description(key))
+            agent.update_map(observation, action)
+            agent._policy_inputs(observation, list(seen.values()), cmds)
+            for component in agent.components:
+                component.after_step(observation, action or "look")
+    return prompt_assembly
+
+
+def run(benchmarks, repeat=5, min_time=0.2):
+    # Median seconds per call over `repeat` timed batches of roughly `min_time` each
+    results = {}
+    for name, fn in benchmarks.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            timer = timeit.Timer(fn)
+            number, _ = timer.autorange()
+            number = max(1, int(number * min_time / 0.2))
+            times = timer.repeat(repeat=repeat, number=number)
+        results[name] = statistics.median(times) / number
+        print(f"{name:<34} {1e6 * results[name]:>12.1f} µs")
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_history(entry, path=HISTORY_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def compare(results, baseline):
+    print(f"\n📊 Change against {baseline['commit']} ({baseline['timestamp']}):")
+    for name, seconds in results.items():
+        before = baseline["results"].get(name)
+        if before:
+            print(f"{name:<34} {100 * (seconds - before) / before:>+8.1f}%")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the non-LLM, non-simulator parts of an episode step.")
+    parser.add_argument("-k", "--filter", type=str, default=None, help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed batches per benchmark; the median is reported.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the latest recorded run of another commit.")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history file.")
+    args = parser.parse_args()
+
+    benchmarks = make_benchmarks()
+    if args.filter:
+        benchmarks = {name: fn for name, fn in benchmarks.items() if args.filter in name}
+
+    commit, dirty = git_commit()
+    results = run(benchmarks, repeat=args.repeat)
+
+    if args.compare:
+        previous = [entry for entry in load_history() if entry["commit"] != commit]
+        if previous:
+            compare(results, previous[-1])
+        else:
+            print("\nℹ️ No earlier commit in the history to compare with.")
+
+    if not args.no_save:
+        save_history({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "results": results,
+        })
+        print(f"\n💾 Appended to {HISTORY_PATH}")
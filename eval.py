@@ -1,150 +1,442 @@
-import json
-import re
-import random
-import os
-
-from alfworld.agents.environment import get_environment
-
-# Import all agents
-from agents.naive_agent import NaiveAgent
-from agents.memory_agent import MemoryAgent
-from agents.cot_agent import CoTAgent
-from agents.cot_memory_agent import CoTMemoryAgent
-from agents.naive_map_agent import NaiveMapAgent
-from agents.memory_map_agent import MemoryMapAgent
-from agents.cot_map_agent import CoTMapAgent
-from agents.cot_memory_map_agent import CoTMemoryMapAgent
-
-import dspy
-from dotenv import load_dotenv
-
-load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
-lm = dspy.LM(model='gpt-4o-mini', api_key=api_key)
-dspy.configure(lm=lm)
-
-def restrict_environment(env, number: int = 1, mode: str = 'scene'):
-    if hasattr(env, "json_file_list"):
-        file_list_attr = "json_file_list"
-    elif hasattr(env, "task_file_list"):
-        file_list_attr = "task_file_list"
-    elif hasattr(env, "game_file_list"):
-        file_list_attr = "game_file_list"
-    elif hasattr(env, "gamefiles"):
-        file_list_attr = "gamefiles"
-    else:
-        raise RuntimeError("Unknown env file list attr")
-
-    file_list = getattr(env, file_list_attr)
-
-    def is_match(path: str) -> bool:
-        if re.search(fr'FloorPlan{number}(?:[^0-9]|$)', path):
-            return True
-        m = re.search(r'-([0-9]{1,3})/', path)
-        return bool(m and int(m.group(1)) == number)
-
-    kept = [p for p in file_list if is_match(p)]
-
-    if not kept:
-        print(f"Warning: No tasks found for floorplan {number} in {file_list_attr}.")
-        print(f"Available tasks: {file_list}")
-        print(f"Regex used: {re.escape(fr'FloorPlan{number}(?:[^0-9]|$)')}")
-        print(f"Regex used: {re.escape(r'-([0-9]{1,3})/')}")
-        print(f"Regex used: {re.escape(r'FloorPlan([0-9]{1,3})')}")
-        raise RuntimeError("No task found!")
-    
-    print(f"Restricting environment to floorplan {number} ({len(kept)} tasks found).")
-
-    setattr(env, file_list_attr, kept)
-    env.num_games = len(kept)
-    return env
-
-def run_episode(extra_attr_path="eval_attributes/extra_attributes.json", config=None, floorplan_number=1, conf_threshold=7.5, agent_type="naive", randomize_floorplan=False):
+import asyncio
+import time
+
+from utils.action_index import ActionIndex
+from utils.command_matcher import ActionSnapper
+from utils.env_pool import EnvPool, strip_task
+from utils.episode_trace import EpisodeRecorder
+from utils.lm_setup import backoff_settings, close_async_session, get_lm
+from utils.metrics import EpisodeMetrics
+from utils.object_index import load_object_index
+from utils.planner import ExplorationPlanner
+from utils.posterior import EvidencePosterior
+from utils.watchdog import SimulatorTimeout
+
+def run_episode(extra_attr_path="eval_attributes/extra_attributes.json", config=None, floorplan_number=1, conf_threshold=7.5, agent_type="naive", randomize_floorplan=False, env_pool=None, trace_path=None):
     assert config is not None, "You must pass a config dictionary to run_episode!"
 
     # Load object attributes
-    with open(extra_attr_path) as f:
-        extra_attributes = json.load(f)
-
-    # Initialize environment
-    env_type = config['env']['type']
-    env = get_environment(env_type)(config, train_eval='train')
-    env = env.init_env(batch_size=1)
-
-    if not randomize_floorplan:
-        restrict_environment(env, number=floorplan_number)
-
-    obs, info = env.reset()
-    lines = obs[0].split('\n')
-    if lines and lines[-1].strip().lower().startswith("your task is to"):
-        obs = ['\n'.join(lines[:-1])]
-
-    # Select agent
-    agent_lookup = {
-        "naive": NaiveAgent,
-        "memory": MemoryAgent,
-        "cot": CoTAgent,
-        "cot_memory": CoTMemoryAgent,
-        "naive_map": NaiveMapAgent,
-        "memory_map": MemoryMapAgent,
-        "cot_map": CoTMapAgent,
-        "cot_memory_map": CoTMemoryMapAgent
+    object_index = load_object_index(extra_attr_path)
+
+    # Reuse a warm environment when a pool is given, otherwise build a throwaway one
+    owns_pool = env_pool is None
+    if owns_pool:
+        env_pool = EnvPool(config, max_envs=1)
+
+    # A hung simulator is killed and the episode retried on a fresh env, up to `benchmark.max_restarts` times
+    max_restarts = (config.get("benchmark") or {}).get("max_restarts", 1)
+    try:
+        for attempt in range(max_restarts + 1):
+            recorder = make_recorder(
+                trace_path,
+                extra_attr_path=extra_attr_path,
+                agent_type=agent_type,
+                floorplan_number=floorplan_number,
+                randomize_floorplan=randomize_floorplan,
+                conf_threshold=conf_threshold
+            )
+            episode = Episode(agent_type, object_index, conf_threshold, config, recorder)
+            try:
+                env = env_pool.acquire(None if randomize_floorplan else floorplan_number)
+                result = _run_episode(env, episode)
+                break
+            except SimulatorTimeout as e:
+                print(f"⏰ {e} (attempt {attempt + 1}/{max_restarts + 1})")
+                episode.abandon()
+                env_pool.restart(e.env)
+                result = failed_result(str(e))
+    finally:
+        if owns_pool:
+            env_pool.close_all()
+
+    return result
+
+def failed_result(error):
+    return {
+        "prediction": None,
+        "confidence": 0.0,
+        "steps": 0,
+        "snap_rate": 0.0,
+        "posterior_stopped": False,
+        "error": error
     }
 
-    if agent_type not in agent_lookup:
-        raise ValueError(f"Unknown agent_type: {agent_type}")
-
-    agent = agent_lookup[agent_type]()
-    seen_descriptions = {}
-    action_history = []
-    step_counter = 0
-    profession = None
-    confidence = 0.0
-
-    while True:
-        cmds = info["admissible_commands"][0]
-        action, profession, confidence, stop = agent(
-            observation=obs[0],
-            seen_descriptions=list(seen_descriptions.values()),
-            admissible_commands=cmds
+# Agents are reused across episodes: a released agent is reset and handed out again
+_idle_agents = {}
+
+def make_agent(agent_type, config=None):
+    idle = _idle_agents.get(agent_type)
+    if idle:
+        agent = idle.pop()
+        agent.reset()
+        return agent
+
+    # The LM and the DSPy agent engine are only loaded once the first agent is needed
+    get_lm(config)
+    from agents.engine import build_agent
+    return build_agent(agent_type, backoff_settings(config))
+
+def release_agent(agent_type, agent):
+    _idle_agents.setdefault(agent_type, []).append(agent)
+
+def make_posterior(config):
+    # Optional evidence-based early stop, enabled by `benchmark.posterior_threshold` in the YAML config
+    threshold = (config.get("benchmark") or {}).get("posterior_threshold")
+    if threshold is None:
+        return None
+    return EvidencePosterior(threshold=threshold, min_evidence=config["benchmark"].get("posterior_min_evidence", 3))
+
+def make_planner(config, observation):
+    # Optional macro-action planner, enabled by `benchmark.planner` in the YAML config
+    if not (config.get("benchmark") or {}).get("planner"):
+        return None
+    planner = ExplorationPlanner()
+    planner.update(observation)
+    return planner
+
+def posterior_stop(posterior, new_objects, seen_descriptions):
+    if posterior is None:
+        return None
+    for obj_key in new_objects:
+        posterior.observe(seen_descriptions[obj_key])
+    if posterior.decisive():
+        profession, probability = posterior.best()
+        return profession, 10 * probability
+    return None
+
+def make_recorder(trace_path, **meta):
+    # Traces are opt-in: no path, no recorder
+    if trace_path is None:
+        return None
+    return EpisodeRecorder(trace_path, **meta)
+
+def discover_objects(observation, object_index, seen_descriptions):
+    found = []
+    for obj_key in object_index.find(observation):
+        if obj_key not in seen_descriptions:
+            seen_descriptions[obj_key] = object_index.description(obj_key)
+            found.append(obj_key)
+            print(f"📦 Found new object: {obj_key} — {seen_descriptions[obj_key]}")
+    return found
+
+class Episode:
+    """
+    One episode on one environment slot, stepped the same way by the sync,
+    async and batched loops: `propose` / `apropose` picks the next action
+    (the planner's, else the agent's snapped to a command) and `observe`
+    takes the slot's observation after `env.step` and says whether the
+    episode is over. `result()` releases the agent and returns the result row.
+    """
+
+    def __init__(self, agent_type, object_index, conf_threshold, config, recorder=None, label=""):
+        self.agent_type = agent_type
+        self.agent = make_agent(agent_type, config)
+        self.object_index = object_index
+        self.conf_threshold = conf_threshold
+        self.config = config
+        self.recorder = recorder
+        self.label = label
+        self.posterior = make_posterior(config)
+        self.planner = None
+        self.seen_descriptions = {}
+        self.action_index = ActionIndex()
+        self.snapper = ActionSnapper()
+        self.metrics = EpisodeMetrics()
+        self.observation = None
+        self.steps = 0
+        self.profession = None
+        self.confidence = 0.0
+        self.stop = False
+        self.posterior_stopped = False
+        self.done = False
+
+    def start(self, observation, admissible_commands):
+        self.observation = strip_task(observation)
+        if self.recorder is not None:
+            self.recorder.record_reset(self.observation, admissible_commands)
+        self.planner = make_planner(self.config, self.observation)
+        self.agent.update_map(self.observation)
+
+    def _agent_inputs(self, admissible_commands):
+        return dict(
+            observation=self.observation,
+            seen_descriptions=list(self.seen_descriptions.values()),
+            admissible_commands=admissible_commands
         )
 
-        # Avoid repetition
-        if action in action_history[-3:]:
-            cmds = [cmd for cmd in cmds if cmd != action]
-            if cmds:
-                action = random.choice(cmds)
-        action_history.append(action)
-
+    def _planned_action(self, admissible_commands):
+        self.metrics.start_step()
+        self._agent_start = time.perf_counter()
+        action = self.planner.next_action(admissible_commands) if self.planner else None
+        if action is not None:
+            self.stop = False
+            # Steps the planner took without an LLM call, reported next to llm_calls
+            self.metrics.add("planned_steps", 1)
+            self.agent.observe_step(self.observation, action)
+            print(f"🧭 {self.label}[Planner] {action}")
+        return action
+
+    def _choose(self, action, admissible_commands, snap=False):
+        # The trace keeps the agent's raw action, so snapping can be re-evaluated from it
+        self.agent_output = (action, self.profession, self.confidence, self.stop)
+        if snap:
+            action = self.snapper.snap(action, admissible_commands)
+        # Agent time covers the planner or the LLM call plus snapping, whichever produced the action
+        self.agent_time = time.perf_counter() - self._agent_start
+        self.metrics.add("agent_s", self.agent_time)
+        self.action = self.action_index.choose(action, admissible_commands)
+        return self.action
+
+    def propose(self, admissible_commands):
+        action = self._planned_action(admissible_commands)
+        if action is None:
+            with self.metrics.activate():
+                action, self.profession, self.confidence, self.stop = self.agent(**self._agent_inputs(admissible_commands))
+            return self._choose(action, admissible_commands, snap=True)
+        return self._choose(action, admissible_commands)
+
+    async def apropose(self, admissible_commands):
+        action = self._planned_action(admissible_commands)
+        if action is None:
+            with self.metrics.activate():
+                action, self.profession, self.confidence, self.stop = await self.agent.aforward(**self._agent_inputs(admissible_commands))
+            return self._choose(action, admissible_commands, snap=True)
+        return self._choose(action, admissible_commands)
+
+    def observe(self, observation, admissible_commands, done, env_time):
+        self.observation = observation
+        self.steps += 1
+        self.metrics.add("env_step_s", env_time)
+
+        with self.metrics.timed("discovery_s"):
+            new_objects = discover_objects(observation, self.object_index, self.seen_descriptions)
+        if self.planner is not None:
+            self.planner.update(observation, self.action, new_objects)
+
+        if self.recorder is not None:
+            self.recorder.record_step(self.agent_output, self.action, observation, admissible_commands, bool(done), new_objects, self.agent_time, env_time,
+                                      [self.seen_descriptions[obj_key] for obj_key in new_objects])
+
+        self.agent.update_map(observation, self.action)
+
+        if self.confidence >= self.conf_threshold or self.stop:
+            print(f"\n✅ {self.label}Agent stopped after {self.steps} steps. Prediction: {self.profession} ({self.confidence:.1f})")
+        else:
+            decided = posterior_stop(self.posterior, new_objects, self.seen_descriptions)
+            if decided:
+                self.profession, self.confidence = decided
+                self.posterior_stopped = True
+                print(f"\n📊 {self.label}Evidence posterior decisive after {self.steps} steps. Prediction: {self.profession} ({self.confidence:.1f})")
+            elif done:
+                print(f"\n🏁 {self.label}Episode finished.")
+            else:
+                return False
+        self.done = True
+        return True
+
+    def abandon(self):
+        # A timed-out attempt still hands its agent back for the retry or the next episode
+        release_agent(self.agent_type, self.agent)
+
+    def result(self):
+        self.metrics.finish()
+        release_agent(self.agent_type, self.agent)
+        result = {
+            "prediction": self.profession,
+            "confidence": self.confidence,
+            "steps": self.steps,
+            "snap_rate": self.snapper.rate(),
+            # Episodes ended by the keyword posterior rather than the agent, so their accuracy can be reported apart
+            "posterior_stopped": self.posterior_stopped,
+            **self.metrics.totals(),
+            "step_metrics": self.metrics.steps
+        }
+        if self.recorder is not None:
+            self.recorder.save(result)
+        return result
+
+def _run_episode(env, episode):
+    obs, info = env.reset()
+    episode.start(obs[0], info["admissible_commands"][0])
+    while True:
+        action = episode.propose(info["admissible_commands"][0])
+        env_start = time.perf_counter()
         obs, scores, dones, info = env.step([action])
-        step_counter += 1
-        obs_text = obs[0].lower()
-
-        for obj_key, obj_info in extra_attributes.items():
-            if obj_key.lower() in obs_text and obj_key not in seen_descriptions:
-                seen_descriptions[obj_key] = obj_info["description"]
-                print(f"📦 Found new object: {obj_key} — {obj_info['description']}")
+        if episode.observe(obs[0], info["admissible_commands"][0], dones[0], time.perf_counter() - env_start):
+            return episode.result()
 
-        if hasattr(agent, "update_map"):
-            agent.update_map(obs[0], action)
-
-        if confidence >= conf_threshold or stop:
-            print(f"\n✅ Agent stopped after {step_counter} steps. Prediction: {profession} ({confidence:.1f})")
-            break
+async def _arun_episode(env, episode):
+    # Same loop as _run_episode; simulator calls run in a thread so LLM calls of other episodes keep flowing
+    obs, info = await asyncio.to_thread(env.reset)
+    episode.start(obs[0], info["admissible_commands"][0])
+    while True:
+        action = await episode.apropose(info["admissible_commands"][0])
+        env_start = time.perf_counter()
+        obs, scores, dones, info = await asyncio.to_thread(env.step, [action])
+        if episode.observe(obs[0], info["admissible_commands"][0], dones[0], time.perf_counter() - env_start):
+            return episode.result()
+
+def make_env_pools(config, count):
+    # One single-environment pool per in-flight episode, so simulators are never shared between episodes
+    return [EnvPool(config, max_envs=1) for _ in range(count)]
+
+async def arun_episodes(episodes, config=None, conf_threshold=7.5, concurrency=8, on_result=None, env_pools=None):
+    """
+    Runs `episodes` (dicts with `extra_attr_path`, `agent_type`,
+    `floorplan_number`, `randomize_floorplan` and optionally `trace_path`,
+    where the episode trace is recorded) on one event loop with at
+    most `concurrency` in flight. Each in-flight episode borrows its own
+    single-environment pool, so simulators are never shared between episodes.
+    Returns results in the order of `episodes`; `on_result(index, result)` is
+    also called as soon as each episode finishes.
+
+    Pools from `make_env_pools` can be passed as `env_pools` to keep their
+    environments warm across calls; at most one episode per pool is then in
+    flight and the caller closes them.
+    """
+    assert config is not None, "You must pass a config dictionary to arun_episodes!"
+
+    max_restarts = (config.get("benchmark") or {}).get("max_restarts", 1)
+    owns_pools = env_pools is None
+    if owns_pools:
+        env_pools = make_env_pools(config, concurrency)
+    free_pools = asyncio.Queue()
+    for pool in env_pools:
+        free_pools.put_nowait(pool)
+
+    async def run_one(index, episode):
+        object_index = load_object_index(episode["extra_attr_path"])
+
+        pool = await free_pools.get()
+        try:
+            floorplan = None if episode.get("randomize_floorplan") else episode.get("floorplan_number", 1)
+            for attempt in range(max_restarts + 1):
+                recorder = make_recorder(
+                    episode.get("trace_path"),
+                    extra_attr_path=episode["extra_attr_path"],
+                    agent_type=episode["agent_type"],
+                    floorplan_number=episode.get("floorplan_number", 1),
+                    randomize_floorplan=episode.get("randomize_floorplan", False),
+                    conf_threshold=conf_threshold
+                )
+                attempt_episode = Episode(episode["agent_type"], object_index, conf_threshold, config, recorder)
+                try:
+                    env = await asyncio.to_thread(pool.acquire, floorplan)
+                    result = await _arun_episode(env, attempt_episode)
+                    break
+                except SimulatorTimeout as e:
+                    print(f"⏰ {e} (attempt {attempt + 1}/{max_restarts + 1})")
+                    attempt_episode.abandon()
+                    await asyncio.to_thread(pool.restart, e.env)
+                    result = failed_result(str(e))
+        finally:
+            free_pools.put_nowait(pool)
+
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    try:
+        return await asyncio.gather(*(run_one(index, episode) for index, episode in enumerate(episodes)))
+    finally:
+        if owns_pools:
+            for pool in env_pools:
+                pool.close_all()
+        await close_async_session()
+
+def run_episodes_async(episodes, config=None, conf_threshold=7.5, concurrency=8, on_result=None, env_pools=None):
+    return asyncio.run(arun_episodes(episodes, config=config, conf_threshold=conf_threshold, concurrency=concurrency, on_result=on_result, env_pools=env_pools))
+
+def run_episode_batch(episodes, config=None, floorplan_number=1, conf_threshold=7.5, batch_size=4, randomize_floorplan=False, env_pool=None):
+    """
+    Runs `episodes` (dicts with `extra_attr_path` and `agent_type`, and
+    optionally `trace_path` plus the `floorplan_number` /
+    `randomize_floorplan` to note in that trace) in lock-step
+    on one environment initialized with `batch_size` slots, so every step is a
+    single `env.step([...])` call.
+
+    ALFWorld only resets all slots together, so episodes run in waves of
+    `batch_size`; a slot that finishes early sends "look" until the wave is
+    done and is then refilled with the next episode. Yields
+    `(index, result)` pairs where `result` matches `run_episode`.
+    """
+    assert config is not None, "You must pass a config dictionary to run_episode_batch!"
+
+    owns_pool = env_pool is None
+    if owns_pool:
+        env_pool = EnvPool(config, max_envs=1)
+
+    max_restarts = (config.get("benchmark") or {}).get("max_restarts", 1)
+    try:
+        for wave_start in range(0, len(episodes), batch_size):
+            # On a simulator timeout only the episodes of the wave that had not finished are rerun
+            pending = list(range(wave_start, min(wave_start + batch_size, len(episodes))))
+            for attempt in range(max_restarts + 1):
+                env = env_pool.acquire(None if randomize_floorplan else floorplan_number, batch_size=batch_size)
+                try:
+                    for offset, result in _run_wave(env, [episodes[i] for i in pending], batch_size, conf_threshold, config):
+                        index = pending[offset]
+                        yield index, result
+                        pending[offset] = None
+                    break
+                except SimulatorTimeout as e:
+                    print(f"⏰ {e} (attempt {attempt + 1}/{max_restarts + 1})")
+                    env_pool.restart(e.env)
+                    pending = [i for i in pending if i is not None]
+            else:
+                for index in pending:
+                    yield index, failed_result("simulator timed out")
+    finally:
+        if owns_pool:
+            env_pool.close_all()
+
+def _run_wave(env, wave, batch_size, conf_threshold, config):
+    episodes = [
+        Episode(
+            episode["agent_type"],
+            load_object_index(episode["extra_attr_path"]),
+            conf_threshold,
+            config,
+            make_recorder(
+                episode.get("trace_path"),
+                extra_attr_path=episode["extra_attr_path"],
+                agent_type=episode["agent_type"],
+                floorplan_number=episode.get("floorplan_number"),
+                randomize_floorplan=episode.get("randomize_floorplan", False),
+                conf_threshold=conf_threshold
+            ),
+            label=f"[Slot {i}] "
+        )
+        for i, episode in enumerate(wave)
+    ]
+
+    try:
+        yield from _step_wave(env, episodes, batch_size)
+    except SimulatorTimeout:
+        for episode in episodes:
+            if not episode.done:
+                episode.abandon()
+        raise
+
+def _step_wave(env, episodes, batch_size):
+    obs, info = env.reset()
+    for i, episode in enumerate(episodes):
+        episode.start(obs[i], info["admissible_commands"][i])
 
-        if dones[0]:
-            print("\n🏁 Episode finished.")
-            break
+    while not all(episode.done for episode in episodes):
+        actions = ["look"] * batch_size
+        for i, episode in enumerate(episodes):
+            if not episode.done:
+                actions[i] = episode.propose(info["admissible_commands"][i])
 
-    env.close()
-    if hasattr(env, "stop_unity"):
-        env.stop_unity()
+        env_start = time.perf_counter()
+        obs, scores, dones, info = env.step(actions)
+        env_time = time.perf_counter() - env_start
 
-    return {
-        "prediction": profession,
-        "confidence": confidence,
-        "steps": step_counter
-    }
+        for i, episode in enumerate(episodes):
+            # One batched step serves every live slot; each is charged the full latency
+            if not episode.done and episode.observe(obs[i], info["admissible_commands"][i], dones[i], env_time):
+                yield i, episode.result()
 
 
 if __name__ == "__main__":
@@ -159,11 +451,14 @@ if __name__ == "__main__":
                         help="Which agent to use.")
     parser.add_argument("--floorplan", type=int, default=1, help="Which floorplan number to use.")
     parser.add_argument("--conf_threshold", type=float, default=7.5, help="Confidence threshold to stop.")
+    parser.add_argument("--env_type", type=str, choices=["AlfredThorEnv", "AlfredTWEnv"], default=None, help="Override env.type from the config; AlfredTWEnv is the text-only fast path.")
     args = parser.parse_args()
 
     # Load config
     with open(args.config) as f:
         config = yaml.safe_load(f)
+    if args.env_type:
+        config["env"]["type"] = args.env_type
 
     result = run_episode(
         extra_attr_path=args.attributes,
@@ -1,16 +1,27 @@
+import contextlib
 import glob
+import importlib.util
+import json
 import os
 import sys
-import pandas as pd
+import time
 import yaml
 import random
 
-from eval import run_episode
+from eval import make_env_pools, run_episode, run_episode_batch, run_episodes_async
+from utils.cost_report import cost_report
+from utils.env_pool import EnvPool
+from utils.experiment import load_or_create_matrix, precise_enough, wilson_interval
+from utils.lm_setup import configured_model, current_lm
+from utils.metrics import append_step_metrics, to_prometheus
+from utils.result_store import ResultStore
+from utils.scheduler import open_worker_pool, run_jobs_parallel
 
 # Constants
 ATTR_DIR = "./eval_attributes"
 GROUND_TRUTH_LABELS = ["professor", "assassin", "student", "billionaire"]
 TOTAL_RUNS = 20
+METRIC_COLUMNS = ["llm_calls", "planned_steps", "llm_cache_hits", "prompt_tokens", "completion_tokens", "prompt_chars", "memory_chars", "map_chars", "llm_s", "agent_s", "env_step_s", "discovery_s", "wall_s"]
 AGENT_TYPES = ["naive", "memory", "cot", "cot_memory", "naive_map", "memory_map", "cot_map", "cot_memory_map"]
 
 def extract_ground_truth(filename):
@@ -25,54 +36,205 @@ def load_config_from_cmd():
     with open(config_path) as f:
         return yaml.safe_load(f)
 
-def batch_evaluate(config, agent_type="naive", randomize_floorplan=True):
-    results = []
-    attribute_files = sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json")))
+def make_jobs(agent_type, attribute_files, randomize_floorplan=True):
+    jobs = []
+    for i in range(TOTAL_RUNS):
+        jobs.append({
+            "run": i,
+            "agent_type": agent_type,
+            "file": random.choice(attribute_files),
+            "floorplan": random.randint(1, 9) if randomize_floorplan else 1,
+            "randomize_floorplan": randomize_floorplan,
+            "seed": random.randrange(2**31),
+            "job_id": f"{agent_type}-{i:03d}",
+        })
+    return jobs
 
-    if not attribute_files:
-        print("❌ No attribute files found matching '*_attributes.json'")
-        return
+def job_trace_path(trace_dir, job):
+    return os.path.join(trace_dir, f"{job['agent_type']}_{job['run']:03d}.json") if trace_dir else None
 
-    print(f"\n🧪 Running {TOTAL_RUNS} randomized episodes on agent '{agent_type}'...\n")
+def run_job(job, config, env_pool=None, conf_threshold=7.5, trace_dir=None):
+    random.seed(job["seed"])
 
-    for i in range(TOTAL_RUNS):
-        file_path = random.choice(attribute_files)
-        ground_truth = extract_ground_truth(file_path)
-        floorplan_number = random.randint(1, 9) if randomize_floorplan else 1
+    print(f"🎯 [Run {job['run']+1}/{TOTAL_RUNS}] Agent: {job['agent_type']} | Attr File: {os.path.basename(job['file'])} | Floor: {job['floorplan']} (GT: {extract_ground_truth(job['file'])})")
 
-        print(f"🎯 [Run {i+1}/{TOTAL_RUNS}] Agent: {agent_type} | Attr File: {os.path.basename(file_path)} | Floor: {floorplan_number} (GT: {ground_truth})")
+    result = run_episode(
+        extra_attr_path=job["file"],
+        config=config,
+        floorplan_number=job["floorplan"],   # This is ignored if randomizing
+        conf_threshold=conf_threshold,
+        agent_type=job["agent_type"],
+        randomize_floorplan=job["randomize_floorplan"],
+        env_pool=env_pool,
+        trace_path=job_trace_path(trace_dir, job)
+    )
 
-        result = run_episode(
-            extra_attr_path=file_path,
+    return annotate_result(result, job)
+
+def annotate_result(result, job):
+    ground_truth = extract_ground_truth(job["file"])
+    result["ground_truth"] = ground_truth
+    result["file"] = os.path.basename(job["file"])
+    result["floorplan"] = job["floorplan"]
+    result["agent_type"] = job["agent_type"]
+    result["correct"] = (result["prediction"] == ground_truth)
+    result["run"] = job["run"]
+    result["job_id"] = job["job_id"]
+    return result
+
+def run_jobs_batched(config, jobs, env_pool, batch_size, on_result, conf_threshold=7.5, trace_dir=None):
+    # Slots of one batched env share a game list, so group jobs by floorplan restriction
+    groups = {}
+    for job in jobs:
+        key = None if job["randomize_floorplan"] else job["floorplan"]
+        groups.setdefault(key, []).append(job)
+
+    for floorplan_key, group in groups.items():
+        episodes = [{
+            "extra_attr_path": job["file"],
+            "agent_type": job["agent_type"],
+            "floorplan_number": job["floorplan"],
+            "randomize_floorplan": job["randomize_floorplan"],
+            "trace_path": job_trace_path(trace_dir, job),
+        } for job in group]
+        print(f"🎯 Running {len(group)} episodes in batches of {batch_size} | Floor: {floorplan_key or 'random'}")
+        for index, result in run_episode_batch(
+            episodes,
             config=config,
-            floorplan_number=floorplan_number,   # This is ignored if randomizing
-            conf_threshold=7.5,
-            agent_type=agent_type,
-            randomize_floorplan=randomize_floorplan
-        )
+            floorplan_number=floorplan_key or 1,
+            conf_threshold=conf_threshold,
+            batch_size=batch_size,
+            randomize_floorplan=floorplan_key is None,
+            env_pool=env_pool
+        ):
+            on_result(annotate_result(result, group[index]))
 
-        result["ground_truth"] = ground_truth
-        result["file"] = os.path.basename(file_path)
-        result["floorplan"] = floorplan_number
-        result["agent_type"] = agent_type
-        result["correct"] = (result["prediction"] == ground_truth)
+def run_jobs_async(config, jobs, concurrency, on_result, conf_threshold=7.5, trace_dir=None, env_pools=None):
+    episodes = [{
+        "extra_attr_path": job["file"],
+        "agent_type": job["agent_type"],
+        "floorplan_number": job["floorplan"],
+        "randomize_floorplan": job["randomize_floorplan"],
+        "trace_path": job_trace_path(trace_dir, job),
+    } for job in jobs]
+    print(f"🎯 Running {len(jobs)} episodes with up to {concurrency} LLM calls in flight")
+    run_episodes_async(
+        episodes,
+        config=config,
+        conf_threshold=conf_threshold,
+        concurrency=concurrency,
+        on_result=lambda index, result: on_result(annotate_result(result, jobs[index])),
+        env_pools=env_pools
+    )
+
+def run_jobs(config, jobs, env_pool=None, workers=1, batch_size=1, concurrency=1, trace_dir=None, store=None, env_pools=None, executor=None):
+    # Every result is written to the store the moment its episode finishes
+    results = []
+
+    def on_result(result):
+        # Per-step timings go to their own JSONL, written here in the parent so workers never share the file
+        steps = result.pop("step_metrics", [])
+        if store is not None:
+            append_step_metrics(store.steps_path, result["job_id"], steps)
+            store.append(result)
         results.append(result)
 
-    # Save
-    df = pd.DataFrame(results)
+    if workers > 1:
+        for result in run_jobs_parallel(run_job, jobs, config, workers=workers, executor=executor, trace_dir=trace_dir):
+            print(f"📥 Finished {result['agent_type']} run {result['run']+1} ({len(results)+1}/{len(jobs)} done)")
+            on_result(result)
+        return results
+
+    if concurrency > 1:
+        run_jobs_async(config, jobs, concurrency, on_result, trace_dir=trace_dir, env_pools=env_pools)
+        return results
+
+    owns_pool = env_pool is None
+    if owns_pool:
+        env_pool = EnvPool(config)
+
+    try:
+        if batch_size > 1:
+            run_jobs_batched(config, jobs, env_pool, batch_size, on_result, trace_dir=trace_dir)
+        else:
+            for job in jobs:
+                on_result(run_job(job, config, env_pool=env_pool, trace_dir=trace_dir))
+        return results
+    finally:
+        if owns_pool:
+            env_pool.close_all()
+
+def save_agent_results(results, agent_type):
+    import pandas as pd
+
+    df = pd.DataFrame(sorted(results, key=lambda r: r["run"])).drop(columns="run")
     out_path = f"results/evaluation_results_{agent_type}.csv"
     df.to_csv(out_path, index=False)
     print(f"\n💾 Results saved to {out_path}")
+    return df
+
+def batch_evaluate(config, agent_type="naive", randomize_floorplan=True, env_pool=None, workers=1, batch_size=1, concurrency=1, trace_dir=None, store=None, env_pools=None):
+    attribute_files = sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json")))
+
+    if not attribute_files:
+        print("❌ No attribute files found matching '*_attributes.json'")
+        return
+
+    print(f"\n🧪 Running {TOTAL_RUNS} randomized episodes on agent '{agent_type}'...\n")
+
+    if store is None:
+        store = ResultStore(f"results/evaluation_results_{agent_type}.jsonl", resume=False)
 
+    jobs = store.pending(make_jobs(agent_type, attribute_files, randomize_floorplan))
+    if len(jobs) < TOTAL_RUNS:
+        print(f"♻️ Resuming: {TOTAL_RUNS - len(jobs)}/{TOTAL_RUNS} episodes already done")
+    run_jobs(config, jobs, env_pool=env_pool, workers=workers, batch_size=batch_size, concurrency=concurrency, trace_dir=trace_dir, store=store, env_pools=env_pools)
+
+    df = save_agent_results(store.results(agent_type), agent_type)
+    print_cache_stats()
     return df
 
-def full_multiagent_benchmark(config, randomize_floorplan=True):
+def print_cache_stats():
+    # Worker processes keep their own counters, so this only covers in-process calls
+    lm = current_lm()
+    if lm is None:
+        return
+    stats = lm.response_cache.stats()
+    print(f"🗄️ LLM cache: {stats['hits']} hits / {stats['misses']} misses ({100 * stats['hit_rate']:.1f}% hit rate)")
+
+@contextlib.contextmanager
+def warm_env_pools(config, concurrency=1):
+    # The shared pool, plus one single-environment pool per in-flight episode when running with --concurrency
+    with contextlib.ExitStack() as stack:
+        env_pool = stack.enter_context(EnvPool(config))
+        env_pools = [stack.enter_context(pool) for pool in make_env_pools(config, concurrency)] if concurrency > 1 else None
+        yield env_pool, env_pools
+
+def full_multiagent_benchmark(config, randomize_floorplan=True, workers=1, batch_size=1, concurrency=1, trace_dir=None, store=None):
     all_results = []
+    if store is None:
+        store = ResultStore("results/full_benchmark_results.jsonl", resume=False)
+
+    if workers > 1:
+        # Farm out every agent's episodes at once so no worker idles between agents
+        attribute_files = sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json")))
+        jobs = store.pending([job for agent_type in AGENT_TYPES for job in make_jobs(agent_type, attribute_files, randomize_floorplan)])
+        print(f"\n🚀 Running {len(jobs)} episodes for {len(AGENT_TYPES)} agents on {workers} workers")
+        run_jobs(config, jobs, workers=workers, trace_dir=trace_dir, store=store)
+        for agent_type in AGENT_TYPES:
+            all_results.append(save_agent_results(store.results(agent_type), agent_type))
+    else:
+        # Warm environments are shared by all agents and only torn down once at the end
+        with warm_env_pools(config, concurrency) as (env_pool, env_pools):
+            for agent_type in AGENT_TYPES:
+                print(f"\n🚀 Starting benchmark for agent: {agent_type}")
+                df = batch_evaluate(config, agent_type=agent_type, randomize_floorplan=randomize_floorplan, env_pool=env_pool, batch_size=batch_size, concurrency=concurrency, trace_dir=trace_dir, store=store, env_pools=env_pools)
+                all_results.append(df)
 
-    for agent_type in AGENT_TYPES:
-        print(f"\n🚀 Starting benchmark for agent: {agent_type}")
-        df = batch_evaluate(config, agent_type=agent_type, randomize_floorplan=randomize_floorplan)
-        all_results.append(df)
+    save_full_results(all_results, config)
+
+def save_full_results(all_results, config=None):
+    import pandas as pd
 
     # Merge all results
     full_df = pd.concat(all_results, ignore_index=True)
@@ -80,16 +242,167 @@ def full_multiagent_benchmark(config, randomize_floorplan=True):
 
     print("\n📚 Full benchmark saved to 'full_benchmark_results.csv'.")
 
+    # Episodes whose simulator hung past every restart carry an `error` and are left out of the summary
+    if "error" in full_df.columns:
+        failed = full_df["error"].notna()
+        if failed.any():
+            print(f"\n⚠️ {failed.sum()} episodes failed and are excluded from the summary")
+        full_df = full_df[~failed]
+
     # Summary
     print("\n🔍 Summary Report:")
     summary = full_df.groupby("agent_type").agg({
         "correct": ["sum", "count", lambda x: 100 * x.sum() / x.count()],
         "steps": "mean",
-        "confidence": "mean"
+        "confidence": "mean",
+        "snap_rate": "mean"
     })
-    summary.columns = ["# Correct", "# Total", "Accuracy (%)", "Avg Steps", "Avg Confidence"]
+    summary.columns = ["# Correct", "# Total", "Accuracy (%)", "Avg Steps", "Avg Confidence", "Avg Snap Rate"]
+    intervals = [wilson_interval(row["# Correct"], row["# Total"]) for _, row in summary.iterrows()]
+    summary["95% CI (%)"] = [f"{100 * low:.0f}–{100 * high:.0f}" for low, high in intervals]
     print(summary)
 
+    # Accuracy of episodes the evidence posterior stopped, apart from those the agent ended itself
+    if "posterior_stopped" in full_df.columns and full_df["posterior_stopped"].fillna(False).astype(bool).any():
+        stopped_by = full_df["posterior_stopped"].fillna(False).astype(bool).map({True: "posterior", False: "agent"}).rename("stopped_by")
+        split = full_df.groupby(["agent_type", stopped_by])["correct"].agg(["sum", "count", lambda x: 100 * x.sum() / x.count()])
+        split.columns = ["# Correct", "# Total", "Accuracy (%)"]
+        print("\n📊 Accuracy by who stopped the episode:")
+        print(split)
+
+    # Per-episode latency and token means; older results rows may predate these columns
+    metric_columns = [c for c in METRIC_COLUMNS if c in full_df.columns]
+    if metric_columns:
+        print("\n⏱️ Per-episode cost (mean):")
+        print(full_df.groupby("agent_type")[metric_columns].mean().round(3))
+        with open("results/metrics.prom", "w") as f:
+            f.write(to_prometheus(full_df[["agent_type"] + metric_columns]))
+        print("📈 Prometheus metrics written to 'results/metrics.prom'")
+
+    if "wall_s" in full_df.columns:
+        report = cost_report(full_df, configured_model(config))
+        report.to_csv("results/cost_report.csv")
+        print("\n💰 Cost / latency report:")
+        print(report.round(4))
+        print(f"🏆 Pareto frontier (accuracy vs USD vs p95 latency): {', '.join(report.index[report['Pareto']])}")
+        print("💾 Cost report saved to 'results/cost_report.csv'")
+    return full_df
+
+def run_experiment(config, agent_types, seed=42, runs=TOTAL_RUNS, ci_half_width=None, min_runs=10, workers=1, trace_dir=None):
+    # Files without a ground-truth label (extra_attributes.json) would be a stratum no agent can get right.
+    attribute_files = [f for f in sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json"))) if extract_ground_truth(f) in GROUND_TRUTH_LABELS]
+    matrix_path = f"results/experiment_seed{seed}_matrix.json"
+
+    jobs = load_or_create_matrix(
+        matrix_path,
+        agent_types=agent_types,
+        attribute_files=attribute_files,
+        floorplans=list(range(1, 10)),
+        runs_per_agent=runs,
+        seed=seed
+    )
+
+    # Resume: anything already in the result store is not rerun
+    store = ResultStore(f"results/experiment_seed{seed}_results.jsonl")
+    if len(store):
+        print(f"♻️ Resuming experiment: {len(store)}/{len(jobs)} episodes already done")
+
+    # Worker processes, like the shared env pool, live for the whole experiment rather than one round
+    worker_pool = open_worker_pool(config, workers) if workers > 1 else contextlib.nullcontext()
+    with EnvPool(config) as env_pool, worker_pool as executor:
+        for round_number in sorted({job["round"] for job in jobs}):
+            active = [a for a in agent_types if not (ci_half_width and precise_enough(store.results(a), ci_half_width, min_runs))]
+            if not active:
+                print(f"\n🛑 All agents reached ±{100 * ci_half_width:.0f}% accuracy precision, stopping early.")
+                break
+
+            pending = store.pending([j for j in jobs if j["round"] == round_number and j["agent_type"] in active])
+            if not pending:
+                continue
+
+            print(f"\n🧪 Round {round_number + 1}: {len(pending)} episodes for {', '.join(active)}")
+            run_jobs(config, pending, env_pool=env_pool, workers=workers, trace_dir=trace_dir, store=store, executor=executor)
+
+    return save_full_results([save_agent_results(store.results(a), a) for a in agent_types if store.results(a)], config)
+
+def dry_run(config, agent_types):
+    """Checks the config and attribute files without importing DSPy, ALFWorld or pandas."""
+    start = time.perf_counter()
+    problems = []
+    warnings = []
+
+    env_type = (config.get("env") or {}).get("type")
+    if env_type not in ("AlfredThorEnv", "AlfredTWEnv", "AlfredHybrid"):
+        problems.append(f"env.type must be AlfredThorEnv, AlfredTWEnv or AlfredHybrid, got {env_type!r}")
+
+    data_path = os.path.expandvars((config.get("dataset") or {}).get("data_path") or "")
+    if not os.path.isdir(data_path):
+        problems.append(f"dataset.data_path is not a directory: {data_path!r} (is ALFWORLD_DATA set?)")
+
+    benchmark = config.get("benchmark") or {}
+    for key in ("posterior_threshold", "reset_timeout", "step_timeout"):
+        value = benchmark.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            problems.append(f"benchmark.{key} must be a positive number or null, got {value!r}")
+    if (benchmark.get("reset_timeout") or benchmark.get("step_timeout")) and importlib.util.find_spec("psutil") is None:
+        problems.append("benchmark.reset_timeout/step_timeout need psutil to kill hung simulators (pip install psutil, or set both to null)")
+    if (benchmark.get("posterior_threshold") or 0) > 1:
+        problems.append("benchmark.posterior_threshold is a probability and must be <= 1")
+
+    lm_settings = config.get("lm") or {}
+    if not isinstance(lm_settings.get("model", ""), str):
+        problems.append(f"lm.model must be a model name, got {lm_settings['model']!r}")
+    for key in ("max_concurrency", "timeout", "connect_timeout", "max_connections", "max_keepalive_connections", "keepalive_expiry"):
+        value = lm_settings.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            problems.append(f"lm.{key} must be a positive number or null, got {value!r}")
+    for key in ("backoff_base_delay", "backoff_max_delay"):
+        value = lm_settings.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            problems.append(f"lm.{key} must be a positive number or null, got {value!r}")
+    if not isinstance(lm_settings.get("rate_limit_retries", 0), int) or lm_settings.get("rate_limit_retries", 0) < 0:
+        problems.append(f"lm.rate_limit_retries must be a non-negative integer, got {lm_settings['rate_limit_retries']!r}")
+    if not isinstance(lm_settings.get("num_retries", 0), int) or lm_settings.get("num_retries", 0) < 0:
+        problems.append(f"lm.num_retries must be a non-negative integer, got {lm_settings['num_retries']!r}")
+
+    for agent_type in agent_types:
+        if agent_type not in AGENT_TYPES:
+            problems.append(f"Unknown agent type {agent_type!r}")
+
+    attribute_files = sorted(glob.glob(os.path.join(ATTR_DIR, "*_attributes.json")))
+    if not attribute_files:
+        problems.append(f"No '*_attributes.json' files in {ATTR_DIR}")
+    for path in attribute_files:
+        try:
+            with open(path) as f:
+                attributes = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            problems.append(f"{path}: {e}")
+            continue
+        if not isinstance(attributes, dict) or not attributes:
+            problems.append(f"{path}: expected a non-empty object of object name -> attributes")
+            continue
+        missing = [name for name, attrs in attributes.items() if not isinstance(attrs, dict) or "description" not in attrs]
+        if missing:
+            problems.append(f"{path}: objects without a description: {', '.join(missing)}")
+        if extract_ground_truth(path) == "unknown":
+            warnings.append(f"{path}: no ground-truth label in the file name, every prediction will score as wrong")
+
+    api_key_env = lm_settings.get("api_key_env", "OPENAI_API_KEY")
+    if os.getenv("LLM_FAKE") != "1" and not (os.getenv(api_key_env) or os.path.exists(".env")):
+        warnings.append(f"{api_key_env} is not set and there is no .env file (fine for LLM_CACHE_REPLAY=1)")
+
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    for problem in problems:
+        print(f"❌ {problem}")
+    elapsed = time.perf_counter() - start
+    if problems:
+        print(f"\n❌ Dry run found {len(problems)} problem(s) in {elapsed:.2f}s")
+    else:
+        print(f"\n✅ Config and {len(attribute_files)} attribute files look good ({elapsed:.2f}s)")
+    return not problems
+
 if __name__ == "__main__":
     import argparse
 
@@ -97,11 +410,48 @@ if __name__ == "__main__":
     parser.add_argument("config", type=str, help="Path to base_config.yaml")
     parser.add_argument("--agent", type=str, choices=AGENT_TYPES + ["all"], default="naive", help="Which agent to evaluate. Use 'all' for full benchmark.")
     parser.add_argument("--floorplan_random", action="store_true", help="Randomize floorplan between 1 and 30 each run.")
+    parser.add_argument("--env_type", type=str, choices=["AlfredThorEnv", "AlfredTWEnv"], default=None, help="Override env.type from the config; AlfredTWEnv is the text-only fast path.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes running episodes in parallel.")
+    parser.add_argument("--batch_size", type=int, default=1, help="Number of episodes stepped in lock-step through one batched environment.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of episodes with LLM calls in flight on one asyncio event loop.")
+    parser.add_argument("--design", type=str, choices=["random", "stratified"], default="random", help="'stratified' runs a seeded, balanced, resumable experiment matrix.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the stratified experiment matrix.")
+    parser.add_argument("--runs", type=int, default=TOTAL_RUNS, help="Max episodes per agent in the stratified design.")
+    parser.add_argument("--ci_half_width", type=float, default=None, help="Stop an agent once its 95%% accuracy CI is within this half-width (e.g. 0.1).")
+    parser.add_argument("--min_runs", type=int, default=10, help="Min episodes per agent before sequential stopping applies.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the episodes already in the results JSONL instead of starting over.")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate the config and attribute files, then exit.")
+    parser.add_argument("--trace_dir", type=str, default=None, help="Record a replayable trace per episode into this directory.")
     args = parser.parse_args()
 
     config = load_config_from_cmd()
+    if args.env_type:
+        # AlfredTWEnv runs the same text observations without launching the THOR renderer
+        config["env"]["type"] = args.env_type
 
-    if args.agent == "all":
-        full_multiagent_benchmark(config, randomize_floorplan=args.floorplan_random)
+    # Only one way of running episodes side by side is used at a time; the others would be silently ignored
+    if sum(flag > 1 for flag in (args.workers, args.batch_size, args.concurrency)) > 1:
+        parser.error("use only one of --workers, --batch_size and --concurrency")
+
+    if args.dry_run:
+        sys.exit(0 if dry_run(config, AGENT_TYPES if args.agent == "all" else [args.agent]) else 1)
+
+    if args.design == "stratified":
+        if args.batch_size > 1 or args.concurrency > 1:
+            parser.error("--design stratified applies a seed per episode and cannot run with --batch_size or --concurrency")
+        run_experiment(
+            config,
+            AGENT_TYPES if args.agent == "all" else [args.agent],
+            seed=args.seed,
+            runs=args.runs,
+            ci_half_width=args.ci_half_width,
+            min_runs=args.min_runs,
+            workers=args.workers,
+            trace_dir=args.trace_dir
+        )
+    elif args.agent == "all":
+        store = ResultStore("results/full_benchmark_results.jsonl", resume=args.resume)
+        full_multiagent_benchmark(config, randomize_floorplan=args.floorplan_random, workers=args.workers, batch_size=args.batch_size, concurrency=args.concurrency, trace_dir=args.trace_dir, store=store)
     else:
-        batch_evaluate(config, agent_type=args.agent, randomize_floorplan=args.floorplan_random)
+        store = ResultStore(f"results/evaluation_results_{args.agent}.jsonl", resume=args.resume)
+        batch_evaluate(config, agent_type=args.agent, randomize_floorplan=args.floorplan_random, workers=args.workers, batch_size=args.batch_size, concurrency=args.concurrency, trace_dir=args.trace_dir, store=store)
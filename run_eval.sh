@@ -3,13 +3,16 @@
 # List of agent types
 AGENTS=("naive" "memory" "cot_memory" "cot" "naive_map" "memory_map" "cot_map" "cot_memory_map")
 
+# Parallel episode workers per agent (override with WORKERS=4 bash run_eval.sh)
+WORKERS=${WORKERS:-1}
+
 # Create a logs directory
 mkdir -p logs
 
 # Loop through each agent
 for AGENT in "${AGENTS[@]}"; do
     echo "🚀 Starting evaluation for agent: $AGENT"
-    python main.py base_config.yaml --agent $AGENT --floorplan_random > "logs/${AGENT}_log.txt" 2>&1
+    python main.py base_config.yaml --agent $AGENT --floorplan_random --workers $WORKERS > "logs/${AGENT}_log.txt" 2>&1
 
     if [ $? -eq 0 ]; then
         echo "✅ Agent $AGENT completed successfully."
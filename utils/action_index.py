@@ -0,0 +1,57 @@
+from collections import Counter, deque
+
+# Commands that never reveal new receptacle contents
+LOW_VALUE_PREFIXES = ("examine", "inventory", "look", "help")
+
+
+class ActionIndex:
+    """
+    Hashed visit counts for the actions of one episode.
+
+    Tracks how often each (location, command) pair was taken and which
+    receptacles were already gone to or opened, plus a window of the last
+    `window` actions for O(1) repetition checks. On a repetition,
+    `replacement()` deterministically picks the least-visited command that
+    leads to an unexplored receptacle instead of a random one.
+    """
+
+    def __init__(self, window=3):
+        self.location = None
+        self.visits = Counter()
+        self.explored = set()
+        self._recent = deque(maxlen=window)
+        self._recent_counts = Counter()
+
+    def is_repeat(self, action):
+        return self._recent_counts[action] > 0
+
+    def record(self, action):
+        self.visits[(self.location, action)] += 1
+        if action.startswith("go to "):
+            self.location = action[len("go to "):]
+            self.explored.add(action)
+        elif action.startswith("open "):
+            self.explored.add(action)
+
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_counts[self._recent[0]] -= 1
+        self._recent.append(action)
+        self._recent_counts[action] += 1
+
+    def _rank(self, order, cmd):
+        novel = (cmd.startswith("go to ") or cmd.startswith("open ")) and cmd not in self.explored
+        low_value = cmd.startswith(LOW_VALUE_PREFIXES)
+        return (not novel, low_value, self.visits[(self.location, cmd)], order)
+
+    def replacement(self, action, cmds):
+        candidates = [(self._rank(order, cmd), cmd) for order, cmd in enumerate(cmds) if cmd != action]
+        if not candidates:
+            return action
+        return min(candidates)[1]
+
+    def choose(self, action, cmds):
+        # Avoid repetition
+        if self.is_repeat(action):
+            action = self.replacement(action, cmds)
+        self.record(action)
+        return action
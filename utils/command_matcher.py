@@ -0,0 +1,75 @@
+import re
+from difflib import SequenceMatcher
+
+_ARTICLES = {"a", "an", "the"}
+_TOKEN = re.compile(r"[a-z]+|\d+")
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _ARTICLES]
+
+
+class CommandMatcher:
+    """
+    Token index over one step's admissible commands.
+
+    `match(text)` returns the admissible command closest to free-text model
+    output: an exact (normalized) match if there is one, otherwise the
+    command sharing the most tokens, where receptacle/object numbers must
+    agree when both sides have them. Ties fall back to string similarity.
+    Returns None when nothing shares a token.
+    """
+
+    def __init__(self, admissible_commands):
+        self.commands = list(admissible_commands)
+        self._tokens = [set(tokenize(cmd)) for cmd in self.commands]
+        self._exact = {" ".join(tokenize(cmd)): cmd for cmd in self.commands}
+        self._index = {}
+        for i, tokens in enumerate(self._tokens):
+            for token in tokens:
+                self._index.setdefault(token, set()).add(i)
+
+    def match(self, text):
+        tokens = tokenize(text)
+        normalized = " ".join(tokens)
+        if normalized in self._exact:
+            return self._exact[normalized]
+
+        query = set(tokens)
+        numbers = {t for t in query if t.isdigit()}
+        candidates = set()
+        for token in query:
+            candidates |= self._index.get(token, set())
+
+        best, best_score = None, None
+        for i in candidates:
+            cmd_numbers = {t for t in self._tokens[i] if t.isdigit()}
+            if numbers and cmd_numbers and not numbers & cmd_numbers:
+                continue
+            overlap = len(query & self._tokens[i]) / len(query | self._tokens[i])
+            score = (overlap, SequenceMatcher(None, normalized, self.commands[i]).ratio())
+            if best_score is None or score > best_score:
+                best, best_score = self.commands[i], score
+        return best
+
+
+class ActionSnapper:
+    """Snaps agent actions onto admissible commands and counts how often that was needed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.snaps = 0
+
+    def snap(self, action, admissible_commands):
+        self.calls += 1
+        if action in admissible_commands:
+            return action
+        matched = CommandMatcher(admissible_commands).match(action)
+        if matched is None:
+            return action
+        self.snaps += 1
+        print(f"🧲 Snapped action '{action}' → '{matched}'")
+        return matched
+
+    def rate(self):
+        return self.snaps / self.calls if self.calls else 0.0
@@ -0,0 +1,76 @@
+# USD per 1M tokens as (input, output); keyed by model name without provider prefix
+PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+def token_prices(model):
+    name = model.split("/")[-1]
+    if name not in PRICES_PER_MILLION:
+        print(f"⚠️ No price known for model '{model}', reporting $0")
+        return 0.0, 0.0
+    input_price, output_price = PRICES_PER_MILLION[name]
+    return input_price / 1e6, output_price / 1e6
+
+
+def cost_report(full_df, model):
+    """
+    Per-agent accuracy next to what it costs: tokens, USD and wall-clock per
+    episode, LLM calls per correct prediction and accuracy per dollar.
+
+    Tokens are what the API billed, so cache hits count as free; `Cache Hit
+    Rate` shows how much of an agent's traffic that covers.
+    """
+    input_price, output_price = token_prices(model)
+    df = full_df.copy()
+    for column in ("prompt_tokens", "completion_tokens", "llm_calls", "llm_cache_hits"):
+        # Columns only appear once some episode reported them (e.g. no tokens in replay-only runs)
+        df[column] = df[column].fillna(0) if column in df.columns else 0
+    df = df.assign(
+        tokens=df["prompt_tokens"] + df["completion_tokens"],
+        usd=df["prompt_tokens"] * input_price + df["completion_tokens"] * output_price,
+    )
+
+    grouped = df.groupby("agent_type")
+    report = grouped.agg(
+        accuracy=("correct", "mean"),
+        episodes=("correct", "count"),
+        correct=("correct", "sum"),
+        tokens_per_episode=("tokens", "mean"),
+        usd_per_episode=("usd", "mean"),
+        p50_wall_s=("wall_s", lambda x: x.quantile(0.5)),
+        p95_wall_s=("wall_s", lambda x: x.quantile(0.95)),
+        llm_calls=("llm_calls", "sum"),
+        cache_hits=("llm_cache_hits", "sum"),
+    )
+    report["llm_calls_per_correct"] = report["llm_calls"] / report["correct"].where(report["correct"] > 0)
+    report["accuracy_per_usd"] = report["accuracy"] / report["usd_per_episode"].where(report["usd_per_episode"] > 0)
+    report["cache_hit_rate"] = report["cache_hits"] / report["llm_calls"].where(report["llm_calls"] > 0)
+    report["pareto"] = pareto_frontier(report, maximize="accuracy", minimize=["usd_per_episode", "p95_wall_s"])
+
+    report = report.drop(columns=["correct", "llm_calls", "cache_hits"])
+    report.columns = [
+        "Accuracy", "# Episodes", "Tokens/Episode", "USD/Episode", "p50 Wall (s)", "p95 Wall (s)",
+        "LLM Calls/Correct", "Accuracy/USD", "Cache Hit Rate", "Pareto"
+    ]
+    return report.sort_values("USD/Episode")
+
+
+def pareto_frontier(df, maximize, minimize):
+    # A row is on the frontier unless another row is at least as good on every axis and better on one
+    on_frontier = []
+    for name, row in df.iterrows():
+        dominated = False
+        for other_name, other in df.iterrows():
+            if other_name == name:
+                continue
+            as_good = other[maximize] >= row[maximize] and all(other[c] <= row[c] for c in minimize)
+            better = other[maximize] > row[maximize] or any(other[c] < row[c] for c in minimize)
+            if as_good and better:
+                dominated = True
+                break
+        on_frontier.append(not dominated)
+    return on_frontier
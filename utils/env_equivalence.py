@@ -0,0 +1,100 @@
+import os
+
+from utils.env_pool import close_env, file_list_attr, restrict_environment, strip_task
+from utils.spatial_map import SpatialMap
+
+
+def _open_env(config, env_type, floorplan_number):
+    from alfworld.agents.environment import get_environment
+
+    env = get_environment(env_type)(config, train_eval='train')
+    restrict_environment(env, number=floorplan_number)
+    return env
+
+
+def _pin_game(env, game_dir):
+    # Keep only the files of one game directory so both envs load the same task
+    attr = file_list_attr(env)
+    kept = [p for p in getattr(env, attr) if os.path.dirname(p) == game_dir]
+    setattr(env, attr, kept)
+    env.num_games = len(kept)
+
+
+def compare_envs(config, floorplan_number=1, max_steps=10):
+    """
+    Plays the same game on AlfredThorEnv and AlfredTWEnv and compares what
+    the profession-guessing task depends on: the receptacles listed at reset,
+    the admissible commands, and the contents revealed when visiting
+    receptacles. Returns a list of mismatch descriptions (empty when the two
+    envs agree).
+    """
+    thor = _open_env(config, "AlfredThorEnv", floorplan_number)
+    tw = _open_env(config, "AlfredTWEnv", floorplan_number)
+
+    thor_dirs = {os.path.dirname(p) for p in getattr(thor, file_list_attr(thor))}
+    tw_dirs = {os.path.dirname(p) for p in getattr(tw, file_list_attr(tw))}
+    common = sorted(thor_dirs & tw_dirs)
+    if not common:
+        raise RuntimeError(f"No game of floorplan {floorplan_number} is available to both envs")
+    _pin_game(thor, common[0])
+    _pin_game(tw, common[0])
+    print(f"Comparing envs on {common[0]}")
+
+    thor = thor.init_env(batch_size=1)
+    tw = tw.init_env(batch_size=1)
+    mismatches = []
+    try:
+        maps = {}
+        infos = {}
+        for name, env in (("thor", thor), ("tw", tw)):
+            obs, info = env.reset()
+            maps[name] = SpatialMap()
+            maps[name].update(strip_task(obs[0]))
+            infos[name] = info
+
+        if set(maps["thor"].receptacles) != set(maps["tw"].receptacles):
+            mismatches.append(f"reset receptacles differ: {sorted(set(maps['thor'].receptacles) ^ set(maps['tw'].receptacles))}")
+
+        for target in list(maps["tw"].receptacles)[:max_steps]:
+            for action in (f"go to {target}", f"open {target}"):
+                thor_cmds = set(infos["thor"]["admissible_commands"][0])
+                tw_cmds = set(infos["tw"]["admissible_commands"][0])
+                if thor_cmds != tw_cmds:
+                    mismatches.append(f"admissible commands differ before '{action}': {sorted(thor_cmds ^ tw_cmds)}")
+                if action not in tw_cmds or action not in thor_cmds:
+                    continue
+                for name, env in (("thor", thor), ("tw", tw)):
+                    obs, _, _, infos[name] = env.step([action])
+                    maps[name].update(obs[0], action)
+
+            thor_contents = maps["thor"].receptacles.get(target)
+            tw_contents = maps["tw"].receptacles.get(target)
+            if (thor_contents and thor_contents.contents) != (tw_contents and tw_contents.contents):
+                mismatches.append(f"contents of {target} differ: thor={thor_contents and thor_contents.contents} tw={tw_contents and tw_contents.contents}")
+    finally:
+        close_env(thor)
+        close_env(tw)
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import yaml
+
+    parser = argparse.ArgumentParser(description="Check that AlfredTWEnv matches AlfredThorEnv for the profession-guessing task.")
+    parser.add_argument("config", type=str, help="Path to YAML config (e.g., base_config.yaml)")
+    parser.add_argument("--floorplan", type=int, default=1, help="Which floorplan number to compare.")
+    parser.add_argument("--steps", type=int, default=10, help="How many receptacles to visit.")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    mismatches = compare_envs(config, floorplan_number=args.floorplan, max_steps=args.steps)
+    for mismatch in mismatches:
+        print(f"❌ {mismatch}")
+    if mismatches:
+        sys.exit(1)
+    print("✅ AlfredTWEnv and AlfredThorEnv agree on receptacles, commands and contents.")
@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import OrderedDict
+
+from utils.floorplan_index import make_floorplan_env
+from utils.watchdog import WatchedEnv, call_with_timeout, child_pids, kill_process_tree, psutil_available
+
+# Held while an env is built, so the processes it spawns can be told apart from other pools'
+_spawn_lock = threading.Lock()
+
+
+def file_list_attr(env):
+    if hasattr(env, "json_file_list"):
+        file_list_attr = "json_file_list"
+    elif hasattr(env, "task_file_list"):
+        file_list_attr = "task_file_list"
+    elif hasattr(env, "game_file_list"):
+        file_list_attr = "game_file_list"
+    elif hasattr(env, "game_files"):
+        file_list_attr = "game_files"
+    elif hasattr(env, "gamefiles"):
+        file_list_attr = "gamefiles"
+    else:
+        raise RuntimeError("Unknown env file list attr")
+    return file_list_attr
+
+
+def restrict_environment(env, number: int = 1, mode: str = 'scene'):
+    list_attr = file_list_attr(env)
+    file_list = getattr(env, list_attr)
+
+    def is_match(path: str) -> bool:
+        if re.search(fr'FloorPlan{number}(?:[^0-9]|$)', path):
+            return True
+        m = re.search(r'-([0-9]{1,3})/', path)
+        return bool(m and int(m.group(1)) == number)
+
+    kept = [p for p in file_list if is_match(p)]
+
+    if not kept:
+        print(f"Warning: No tasks found for floorplan {number} in {list_attr}.")
+        print(f"Available tasks: {file_list}")
+        print(f"Regex used: {re.escape(fr'FloorPlan{number}(?:[^0-9]|$)')}")
+        print(f"Regex used: {re.escape(r'-([0-9]{1,3})/')}")
+        print(f"Regex used: {re.escape(r'FloorPlan([0-9]{1,3})')}")
+        raise RuntimeError("No task found!")
+
+    print(f"Restricting environment to floorplan {number} ({len(kept)} tasks found).")
+
+    setattr(env, list_attr, kept)
+    env.num_games = len(kept)
+    return env
+
+
+def strip_task(observation):
+    lines = observation.split('\n')
+    if lines and lines[-1].strip().lower().startswith("your task is to"):
+        return '\n'.join(lines[:-1])
+    return observation
+
+
+def close_env(env):
+    env.close()
+    if hasattr(env, "stop_unity"):
+        env.stop_unity()
+
+
+class EnvPool:
+    """
+    Keeps initialized ALFWorld environments alive across episodes.
+
+    Environments are keyed by (env type, floorplan restriction, batch size); a
+    floorplan of None means the full, unrestricted game list. Each episode just calls
+    `env.reset()` on a warm environment instead of relaunching THOR. At most
+    `max_envs` environments are kept, the least recently used one is closed
+    when a new key needs room.
+
+    Environments are wrapped in a WatchedEnv with the `benchmark.reset_timeout`
+    and `benchmark.step_timeout` of the config; `restart(env)` kills a hung
+    one and the next `acquire` builds a fresh environment.
+    """
+
+    def __init__(self, config, max_envs=4):
+        self.config = config
+        self.max_envs = max_envs
+        self._envs = OrderedDict()
+        benchmark = config.get("benchmark") or {}
+        self.reset_timeout = benchmark.get("reset_timeout")
+        self.step_timeout = benchmark.get("step_timeout")
+        # Without psutil the simulator processes an env started cannot be found, so a hung one would never be killed
+        if (self.reset_timeout or self.step_timeout) and not psutil_available():
+            raise RuntimeError("benchmark.reset_timeout/step_timeout need psutil to kill hung simulators: pip install psutil (or set both to null)")
+
+    def acquire(self, floorplan_number=None, env_type=None, batch_size=1):
+        env_type = env_type or self.config['env']['type']
+        key = (env_type, floorplan_number, batch_size)
+
+        if key in self._envs:
+            self._envs.move_to_end(key)
+            return self._envs[key]
+
+        while len(self._envs) >= self.max_envs:
+            old_key, old_env = self._envs.popitem(last=False)
+            print(f"♻️ Closing idle environment {old_key}")
+            close_env(old_env)
+
+        # Imported here so replay/offline tools can use the pool module without ALFWorld installed
+        from alfworld.agents.environment import get_environment
+
+        print(f"🏗️ Starting environment {key}")
+        with _spawn_lock:
+            before = child_pids()
+            # Restrict before init_env: AlfredTWEnv registers its game list when the batch env is built
+            if floorplan_number is not None:
+                env = make_floorplan_env(get_environment(env_type), self.config, floorplan_number)
+            else:
+                env = get_environment(env_type)(self.config, train_eval='train')
+
+            env = env.init_env(batch_size=batch_size)
+            owned_pids = child_pids() - before
+
+        env = WatchedEnv(env, self.reset_timeout, self.step_timeout, owned_pids)
+        self._envs[key] = env
+        return env
+
+    def restart(self, env):
+        # Drop a hung env and kill only the simulator processes it started
+        for key, pooled in list(self._envs.items()):
+            if pooled is env:
+                del self._envs[key]
+                print(f"🔁 Restarting hung environment {key}")
+        kill_process_tree(env.owned_pids)
+        try:
+            call_with_timeout(close_env, env.env, timeout=10, label="env.close")
+        except Exception as e:
+            print(f"⚠️ Could not close hung environment cleanly: {e}")
+
+    def close_all(self):
+        while self._envs:
+            _, env = self._envs.popitem(last=False)
+            close_env(env)
+
+    def __len__(self):
+        return len(self._envs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close_all()
+        return False
@@ -0,0 +1,179 @@
+import glob
+import json
+import os
+import time
+
+from utils.posterior import GROUND_TRUTH_LABELS, EvidencePosterior
+
+
+class EpisodeRecorder:
+    """
+    Collects a compact trace of one episode and writes it as a single JSON
+    file: the reset observation, then per step the agent output, the action
+    actually sent, the resulting observation and admissible commands, newly
+    discovered objects with their descriptions and agent/env timings.
+    """
+
+    def __init__(self, path, **meta):
+        self.path = path
+        self.trace = {"meta": meta, "reset": None, "steps": [], "result": None}
+
+    def record_reset(self, observation, admissible_commands):
+        self.trace["reset"] = {"observation": observation, "admissible_commands": admissible_commands}
+
+    def record_step(self, agent_output, action, observation, admissible_commands, done, new_objects, agent_time, env_time, new_descriptions=()):
+        action_chosen, prediction, confidence, stop = agent_output
+        self.trace["steps"].append({
+            "agent_action": action_chosen,
+            "action": action,
+            "prediction": prediction,
+            "confidence": confidence,
+            "stop": stop,
+            "observation": observation,
+            "admissible_commands": admissible_commands,
+            "done": done,
+            "new_objects": new_objects,
+            "new_descriptions": list(new_descriptions),
+            "agent_time": round(agent_time, 4),
+            "env_time": round(env_time, 4),
+        })
+
+    def save(self, result):
+        self.trace["result"] = result
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.trace, f, separators=(",", ":"), default=str)
+
+
+def load_trace(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class ReplayEnv:
+    """
+    Stand-in for a batch_size=1 ALFWorld env that plays back a recorded
+    trace. Observations follow the recording regardless of the action sent,
+    so an agent that diverges still sees the original episode. Once the
+    recording runs out the episode reports done.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self._step = 0
+
+    def reset(self):
+        self._step = 0
+        reset = self.trace["reset"]
+        return [reset["observation"]], {"admissible_commands": [reset["admissible_commands"]]}
+
+    def step(self, actions):
+        steps = self.trace["steps"]
+        if self._step >= len(steps):
+            last = steps[-1] if steps else self.trace["reset"]
+            return [last["observation"]], [0], [True], {"admissible_commands": [last["admissible_commands"]]}
+        step = steps[self._step]
+        self._step += 1
+        done = step["done"] or self._step == len(steps)
+        return [step["observation"]], [0], [done], {"admissible_commands": [step["admissible_commands"]]}
+
+    def close(self):
+        pass
+
+
+class ReplayPool:
+    """EnvPool look-alike handing out a ReplayEnv, for `run_episode(env_pool=...)`."""
+
+    def __init__(self, trace):
+        self.env = ReplayEnv(trace)
+
+    def acquire(self, floorplan_number=None, env_type=None, batch_size=1):
+        return self.env
+
+    def close_all(self):
+        pass
+
+
+def rescore_trace(trace, conf_threshold=7.5, posterior_threshold=None, min_evidence=3):
+    """
+    Re-applies the stopping rule of run_episode to the recorded agent outputs,
+    without re-running the agent. Only thresholds at or above the recorded one
+    are exact, since the recording stops where the original run stopped.
+
+    With `posterior_threshold` the evidence posterior is re-run over the
+    recorded object descriptions, checked after the agent's own stop as in
+    run_episode. Without it, an episode the posterior stopped keeps the
+    recorded prediction if the agent does not stop first.
+    """
+    posterior = EvidencePosterior(threshold=posterior_threshold, min_evidence=min_evidence) if posterior_threshold else None
+    recorded = trace.get("result") or {}
+    profession, confidence, steps = None, 0.0, 0
+    for step in trace["steps"]:
+        steps += 1
+        profession, confidence = step["prediction"], step["confidence"]
+        if confidence >= conf_threshold or step["stop"]:
+            break
+        if posterior is not None:
+            for description in step.get("new_descriptions", []):
+                posterior.observe(description)
+            if posterior.decisive():
+                label, probability = posterior.best()
+                return {"prediction": label, "confidence": 10 * probability, "steps": steps, "posterior_stopped": True}
+        elif recorded.get("posterior_stopped") and steps == len(trace["steps"]):
+            return {"prediction": recorded["prediction"], "confidence": recorded["confidence"], "steps": steps, "posterior_stopped": True}
+        if step["done"]:
+            break
+    return {"prediction": profession, "confidence": confidence, "steps": steps, "posterior_stopped": False}
+
+
+def infer_label(path):
+    for label in GROUND_TRUTH_LABELS:
+        if label in os.path.basename(path).lower():
+            return label
+    return "unknown"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rescore recorded episode traces without a simulator or LLM, or re-run an agent on them.")
+    parser.add_argument("trace_dir", type=str, help="Directory of trace JSON files.")
+    parser.add_argument("--conf_threshold", type=float, default=7.5, help="Confidence threshold to stop.")
+    parser.add_argument("--posterior_threshold", type=float, default=None, help="Re-run the evidence posterior early stop at this probability (e.g. 0.9).")
+    parser.add_argument("--posterior_min_evidence", type=int, default=3, help="Min object descriptions before the posterior may stop.")
+    parser.add_argument("--rerun", type=str, default=None, metavar="CONFIG", help="Re-run the agent against each trace (no simulator) with this YAML config; use LLM_CACHE_REPLAY=1 to stay offline.")
+    parser.add_argument("--agent", type=str, default=None, help="Agent to re-run instead of the recorded one (with --rerun).")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.trace_dir, "*.json")))
+    if args.rerun:
+        import yaml
+        # Imported here: eval imports this module for the recorder
+        from eval import run_episode
+
+        with open(args.rerun) as f:
+            config = yaml.safe_load(f)
+    start = time.perf_counter()
+    correct = 0
+    total_steps = 0
+    for path in paths:
+        trace = load_trace(path)
+        if args.rerun:
+            result = run_episode(
+                extra_attr_path=trace["meta"]["extra_attr_path"],
+                config=config,
+                conf_threshold=args.conf_threshold,
+                agent_type=args.agent or trace["meta"]["agent_type"],
+                env_pool=ReplayPool(trace)
+            )
+        else:
+            result = rescore_trace(trace, conf_threshold=args.conf_threshold, posterior_threshold=args.posterior_threshold, min_evidence=args.posterior_min_evidence)
+        ground_truth = infer_label(trace["meta"].get("extra_attr_path", ""))
+        correct += result["prediction"] == ground_truth
+        total_steps += result["steps"]
+        print(f"{os.path.basename(path)}: {result['prediction']} ({result['confidence']:.1f}) after {result['steps']} steps (GT: {ground_truth})")
+
+    if paths:
+        print(f"\n🔍 {correct}/{len(paths)} correct ({100 * correct / len(paths):.1f}%), avg steps {total_steps / len(paths):.1f} "
+              f"[rescored in {time.perf_counter() - start:.2f}s]")
@@ -0,0 +1,79 @@
+import json
+import math
+import os
+import random
+
+
+def wilson_interval(correct, total, z=1.96):
+    if total == 0:
+        return 0.0, 1.0
+    p = correct / total
+    denom = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denom
+    half = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def build_matrix(agent_types, attribute_files, floorplans, runs_per_agent, seed=42):
+    """
+    Seeded, stratified experiment matrix.
+
+    Runs are grouped into rounds that visit every attribute file (profession)
+    once, and floorplans are drawn without replacement from a shuffled
+    (file, floorplan) grid so they stay balanced within each profession.
+    Every agent gets the same cells and seeds, which makes agent comparisons
+    paired. Each job has a stable `job_id` so partially run matrices can be
+    resumed.
+    """
+    rng = random.Random(seed)
+    per_file = {}
+    for file_path in attribute_files:
+        per_file[file_path] = list(floorplans)
+        rng.shuffle(per_file[file_path])
+
+    cells = []
+    for run in range(runs_per_agent):
+        file_path = attribute_files[run % len(attribute_files)]
+        plans = per_file[file_path]
+        cells.append((file_path, plans[(run // len(attribute_files)) % len(plans)], rng.randrange(2**31)))
+
+    return [
+        {
+            "job_id": f"{agent_type}-{run:03d}",
+            "run": run,
+            "round": run // len(attribute_files),
+            "agent_type": agent_type,
+            "file": file_path,
+            "floorplan": floorplan,
+            "randomize_floorplan": False,
+            "seed": cell_seed,
+        }
+        for agent_type in agent_types
+        for run, (file_path, floorplan, cell_seed) in enumerate(cells)
+    ]
+
+
+def load_or_create_matrix(path, **params):
+    # Reuse the stored matrix when the design parameters match, so reruns resume the same cells
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)
+        if stored["params"] == params:
+            return stored["jobs"]
+        print(f"⚠️ Experiment parameters changed, rebuilding {path}")
+
+    jobs = build_matrix(**params)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"params": params, "jobs": jobs}, f, indent=1)
+    return jobs
+
+
+def precise_enough(results, ci_half_width, min_runs):
+    """True once an agent's accuracy Wilson interval is at most `ci_half_width` either side."""
+    total = len(results)
+    if total < min_runs:
+        return False
+    low, high = wilson_interval(sum(bool(r["correct"]) for r in results), total)
+    return (high - low) / 2 <= ci_half_width
@@ -0,0 +1,209 @@
+import ast
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The HTTP server works without DSPy; FakeLM and CachedFakeLM only exist when it is installed
+try:
+    import dspy
+    from utils.llm_cache import CachedLM
+except ImportError:
+    dspy = None
+
+OUTPUT_FIELD = re.compile(r"^\d+\. `(\w+)` \((.+?)\)(?::.*)?$", re.MULTILINE)
+ADMISSIBLE_COMMANDS = re.compile(r"\[\[ ## admissible_commands ## \]\]\n(.*?)(?:\n\n|\Z)", re.DOTALL)
+
+
+class FakeAPIError(RuntimeError):
+    status_code = 500
+
+
+class FakeRateLimitError(RuntimeError):
+    status_code = 429
+
+
+class StandIn:
+    """
+    Deterministic replacement for the chat completions API.
+
+    Reads the output fields DSPy's ChatAdapter lists in the system message
+    and answers every one of them in the `[[ ## field ## ]]` format, so all
+    agent signatures parse. Values depend only on `seed` and the messages:
+    `action` is one of the admissible commands, Literal fields pick one of
+    their options, numbers fall in 0-10.
+
+    Latency is `latency` seconds scaled by a lognormal factor with
+    `latency_sigma`; `error_rate` and `rate_limit_rate` are the chances a
+    call fails with a 500 or a 429.
+    """
+
+    def __init__(self, latency=0.0, latency_sigma=0.5, error_rate=0.0, rate_limit_rate=0.0, seed=0):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        # Latency and failures come from one seeded stream, so a run is reproducible call for call
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            latency = self.latency * self._rng.lognormvariate(0, self.latency_sigma) if self.latency else 0.0
+        if roll < self.rate_limit_rate:
+            return latency, FakeRateLimitError("Rate limit reached for fake/stand-in (429)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, FakeAPIError("Simulated API error (500)")
+        return latency, None
+
+    def respond(self, messages):
+        digest = hashlib.sha256(json.dumps([self.seed, messages], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+
+        system = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        user = str(messages[-1].get("content", "")) if messages else ""
+        output_section = system.split("Your output fields are:", 1)[-1].split("\n\n", 1)[0]
+
+        parts = []
+        for name, type_name in OUTPUT_FIELD.findall(output_section):
+            parts.append(f"[[ ## {name} ## ]]\n{self._value(name, type_name, user, rng)}")
+        parts.append("[[ ## completed ## ]]")
+        return "\n\n".join(parts)
+
+    def _value(self, name, type_name, user, rng):
+        if type_name.startswith("Literal["):
+            return rng.choice(ast.literal_eval(type_name[len("Literal"):]))
+        if type_name in ("float", "int"):
+            return round(rng.uniform(0, 10), 1) if type_name == "float" else rng.randint(0, 10)
+        if type_name == "bool":
+            return rng.random() < 0.1
+        if name == "action":
+            return rng.choice(admissible_commands(user))
+        if type_name.startswith("list"):
+            return "[]"
+        return f"Stand-in {name} for this step."
+
+    def usage(self, messages, text):
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        return {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(text) // 4}
+
+
+def admissible_commands(user_message):
+    match = ADMISSIBLE_COMMANDS.search(user_message)
+    if match:
+        try:
+            commands = json.loads(match.group(1))
+            if commands:
+                return commands
+        except json.JSONDecodeError:
+            pass
+    return ["look"]
+
+
+if dspy is not None:
+    class FakeLM(dspy.LM):
+        """dspy.LM answered in-process by a StandIn; no network or API key needed."""
+
+        def __init__(self, model="fake/stand-in", latency=0.0, latency_sigma=0.5, error_rate=0.0, rate_limit_rate=0.0, seed=0, **kwargs):
+            super().__init__(model, **kwargs)
+            self.stand_in = StandIn(latency, latency_sigma, error_rate, rate_limit_rate, seed)
+
+        def _messages(self, prompt, messages):
+            return messages or [{"role": "user", "content": prompt}]
+
+        def _complete(self, messages):
+            text = self.stand_in.respond(messages)
+            self.history.append({"messages": messages, "outputs": [text], "usage": self.stand_in.usage(messages, text), "model": self.model})
+            return [text]
+
+        def __call__(self, prompt=None, messages=None, **kwargs):
+            messages = self._messages(prompt, messages)
+            latency, error = self.stand_in.delay()
+            time.sleep(latency)
+            if error is not None:
+                raise error
+            return self._complete(messages)
+
+        async def acall(self, prompt=None, messages=None, **kwargs):
+            messages = self._messages(prompt, messages)
+            latency, error = self.stand_in.delay()
+            await asyncio.sleep(latency)
+            if error is not None:
+                raise error
+            return self._complete(messages)
+
+    class CachedFakeLM(CachedLM, FakeLM):
+        """FakeLM behind the response cache, to exercise the cache under load."""
+
+        def __init__(self, model="fake/stand-in", **kwargs):
+            # CachedLM.__init__ comes first in the MRO and takes `model` positionally
+            super().__init__(model, **kwargs)
+
+
+def serve(port=8000, **stand_in_options):
+    """
+    OpenAI-compatible `POST /v1/chat/completions` endpoint backed by a
+    StandIn, for runs that should go through the real HTTP client.
+    """
+    stand_in = StandIn(**stand_in_options)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            messages = request.get("messages", [])
+
+            latency, error = stand_in.delay()
+            time.sleep(latency)
+            if error is not None:
+                return self._send(error.status_code, {"error": {"message": str(error), "type": type(error).__name__}})
+
+            text = stand_in.respond(messages)
+            usage = stand_in.usage(messages, text)
+            self._send(200, {
+                "id": f"chatcmpl-{stand_in.calls}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake/stand-in"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {**usage, "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]},
+            })
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🤖 Fake LLM listening on http://127.0.0.1:{port}/v1 (latency {stand_in.latency}s, errors {stand_in.error_rate}, 429s {stand_in.rate_limit_rate})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a deterministic OpenAI-compatible stand-in for the agent LLM.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.5, help="Median seconds per call.")
+    parser.add_argument("--latency_sigma", type=float, default=0.5, help="Sigma of the lognormal latency factor.")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of calls answered with a 500.")
+    parser.add_argument("--rate_limit_rate", type=float, default=0.0, help="Fraction of calls answered with a 429.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    serve(args.port, latency=args.latency, latency_sigma=args.latency_sigma, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+
+_FLOORPLAN = re.compile(r'-([0-9]{1,3})$')
+# Bumped whenever the cached index layout or its filters change
+INDEX_VERSION = 2
+
+
+def _data_signature(data_path):
+    # Adding or removing task folders changes these mtimes, which invalidates the cached index
+    entries = sorted((entry.name, entry.stat().st_mtime_ns) for entry in os.scandir(data_path) if entry.is_dir())
+    return hashlib.sha256(json.dumps([data_path, entries]).encode("utf-8")).hexdigest()
+
+
+def build_index(data_path):
+    """
+    Lists the games under `data_path` that ALFWorld itself would load, as
+    [game directory, task_type, floorplan] rows in ALFWorld's os.walk order.
+    Applies the same filters as AlfredThorEnv.get_env_paths and
+    AlfredTWEnv.collect_game_files: no movable or Sliced tasks, a
+    game.tw-pddl must exist and be marked solvable. The task type filter
+    and the num_train_games cut depend on the config and are applied by
+    floorplan_games().
+    """
+    games = []
+    for root, dirs, files in os.walk(data_path, topdown=False):
+        if 'traj_data.json' not in files:
+            continue
+        if 'movable' in root or 'Sliced' in root:
+            continue
+        game_file_path = os.path.join(root, "game.tw-pddl")
+        if not os.path.exists(game_file_path):
+            continue
+        with open(game_file_path) as f:
+            if not json.load(f).get('solvable'):
+                continue
+        m = _FLOORPLAN.search(os.path.basename(os.path.dirname(root)))
+        if not m:
+            continue
+        with open(os.path.join(root, 'traj_data.json')) as f:
+            task_type = json.load(f)['task_type']
+        games.append([root, task_type, m.group(1)])
+    return games
+
+
+def load_index(data_path, cache_dir=".cache"):
+    data_path = os.path.abspath(os.path.expandvars(data_path))
+    signature = _data_signature(data_path)
+    cache_path = os.path.join(cache_dir, f"floorplan_index_{hashlib.sha256(data_path.encode('utf-8')).hexdigest()[:12]}.json")
+
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("version") == INDEX_VERSION and cached.get("signature") == signature:
+            return cached["games"]
+
+    print(f"🗂️ Building floorplan index for {data_path}")
+    games = build_index(data_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump({"version": INDEX_VERSION, "signature": signature, "games": games}, f)
+    return games
+
+
+# ALFWorld's config keys for each split: (data path, game limit)
+SPLITS = {
+    'train': ('data_path', 'num_train_games'),
+    'eval_in_distribution': ('eval_id_data_path', 'num_eval_games'),
+    'eval_out_of_distribution': ('eval_ood_data_path', 'num_eval_games'),
+}
+
+_indexes = {}
+_floorplans = {}
+
+
+def group_by_floorplan(games, task_names, limit=-1):
+    """Maps floorplan -> game directories of the index rows with one of `task_names`, keeping the first `limit` when it is > 0."""
+    games = [game for game in games if game[1] in task_names]
+    # ALFWorld keeps the first num_*_games of the whole split, before any floorplan is chosen
+    if limit > 0:
+        games = games[:limit]
+    by_floorplan = {}
+    for game_dir, _, floorplan in games:
+        by_floorplan.setdefault(floorplan, []).append(game_dir)
+    return by_floorplan
+
+
+def floorplan_games(config, floorplan_number, train_eval='train'):
+    """Game directories of one floorplan, as ALFWorld would list them for the configured split, task types and game limit."""
+    path_key, limit_key = SPLITS[train_eval]
+    data_path = config['dataset'][path_key]
+    limit = config['dataset'].get(limit_key, -1)
+
+    from alfworld.agents.environment.alfred_tw_env import TASK_TYPES
+    task_names = frozenset(TASK_TYPES[t] for t in config['env']['task_types'] if t in TASK_TYPES)
+
+    key = (data_path, task_names, limit)
+    if key not in _floorplans:
+        if data_path not in _indexes:
+            _indexes[data_path] = load_index(data_path)
+        _floorplans[key] = group_by_floorplan(_indexes[data_path], task_names, limit)
+    return _floorplans[key].get(str(floorplan_number), [])
+
+
+def make_floorplan_env(env_cls, config, floorplan_number, train_eval='train'):
+    """
+    Builds an ALFWorld env whose game list comes straight from the floorplan
+    index, instead of scanning the whole split and filtering it afterwards.
+    """
+    games = floorplan_games(config, floorplan_number, train_eval)
+    if not games:
+        raise RuntimeError(f"No task found for floorplan {floorplan_number}!")
+
+    class FloorplanEnv(env_cls):
+        def get_env_paths(self):
+            # AlfredThorEnv
+            self.json_file_list = [os.path.join(d, "traj_data.json") for d in games]
+            self.num_games = len(self.json_file_list)
+
+        def collect_game_files(self, verbose=False):
+            # AlfredTWEnv
+            self.game_files = [os.path.join(d, "game.tw-pddl") for d in games]
+            self.num_games = len(self.game_files)
+
+    FloorplanEnv.__name__ = env_cls.__name__
+    print(f"Restricting environment to floorplan {floorplan_number} ({len(games)} tasks found).")
+    return FloorplanEnv(config, train_eval=train_eval)
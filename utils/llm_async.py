@@ -0,0 +1,34 @@
+import asyncio
+import random
+
+# Private RNG so backoff jitter does not disturb seeded episode randomness
+_jitter = random.Random()
+
+
+def is_rate_limit_error(e):
+    if "RateLimit" in type(e).__name__:
+        return True
+    if getattr(e, "status_code", None) == 429:
+        return True
+    return "429" in str(e) or "rate limit" in str(e).lower()
+
+
+async def acall_with_backoff(module, max_retries=5, base_delay=1.0, max_delay=30.0, **kwargs):
+    """
+    Awaits a DSPy module call, retrying rate-limit errors with jittered
+    exponential backoff. Any other error is raised immediately.
+
+    Falls back to running the blocking call in a thread when the installed
+    DSPy has no native `acall`.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            if hasattr(module, "acall"):
+                return await module.acall(**kwargs)
+            return await asyncio.to_thread(module, **kwargs)
+        except Exception as e:
+            if attempt == max_retries or not is_rate_limit_error(e):
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * _jitter.uniform(0.5, 1.0)
+            print(f"⏳ Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
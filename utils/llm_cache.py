@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import dspy
+
+from utils.lm_setup import bind_async_session
+from utils.metrics import record
+
+
+class CacheMissError(RuntimeError):
+    pass
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of LM outputs keyed by a content hash.
+
+    Holds about `max_entries` rows: once the limit is passed the least
+    recently used tenth is evicted in one batch. The row count is tracked in
+    memory and re-read from the table every `recount_every` inserts, so rows
+    added by other processes are noticed with some delay. Hits update
+    `last_used` in batches rather than with a write per hit. Safe to share
+    between threads and between worker processes pointing at the same file.
+    """
+
+    def __init__(self, path, max_entries=100_000, recount_every=1000, touch_batch=100, touch_interval=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.recount_every = recount_every
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._last_flush = time.monotonic()
+        self._inserts = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.commit()
+        self._count = self._count_rows()
+
+    @staticmethod
+    def make_key(**parts):
+        blob = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _count_rows(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def _flush_touched(self):
+        # Called with the lock held; writes the batched `last_used` updates of cache hits
+        if self._touched:
+            self._db.executemany("UPDATE responses SET last_used = ? WHERE key = ?", [(t, key) for key, t in self._touched.items()])
+            self._db.commit()
+            self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.touch_batch or time.monotonic() - self._last_flush >= self.touch_interval:
+                self._flush_touched()
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses (key, value, last_used) VALUES (?, ?, ?)", (key, json.dumps(value), time.time()))
+            self._count += 1
+            self._inserts += 1
+            if self._inserts % self.recount_every == 0:
+                self._count = self._count_rows()
+            if self._count > self.max_entries:
+                self._flush_touched()
+                self._count = self._count_rows()
+                if self._count > self.max_entries:
+                    excess = self._count - self.max_entries + self.max_entries // 10
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                        (excess,)
+                    )
+                    self._count -= excess
+            self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._db.close()
+
+
+class CachedLM(dspy.LM):
+    """
+    dspy.LM whose outputs are persisted in a ResponseCache.
+
+    The cache key covers the model name, the sampling kwargs (temperature,
+    max_tokens, ...) and the fully rendered prompt/messages, which already
+    contain the signature instructions and inputs. With `replay_only` a miss
+    raises CacheMissError instead of calling the API.
+
+    `max_concurrency` caps the API requests this process has in flight;
+    cache hits are never throttled.
+    """
+
+    def __init__(self, model, cache_path=".cache/llm_cache.sqlite", max_entries=100_000, replay_only=False, max_concurrency=None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.response_cache = ResponseCache(cache_path, max_entries=max_entries)
+        self.replay_only = replay_only
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._async_slots = None
+
+    def _cache_key(self, prompt, messages, kwargs):
+        # Connection settings do not change the response, so they stay out of the key
+        sampling = {k: v for k, v in {**self.kwargs, **kwargs}.items() if k not in ("api_key", "api_base", "timeout")}
+        return ResponseCache.make_key(model=self.model, sampling=sampling, prompt=prompt, messages=messages)
+
+    def _lookup(self, key):
+        outputs = self.response_cache.get(key)
+        if outputs is None and self.replay_only:
+            raise CacheMissError(f"No cached LM response for key {key[:12]} (replay-only mode)")
+        return outputs
+
+    def _record_call(self, prompt, messages, start, cached):
+        # Reported into the EpisodeMetrics active in the caller's context, if any
+        record("llm_calls", 1)
+        record("llm_cache_hits", int(cached))
+        record("llm_s", time.perf_counter() - start)
+        record("prompt_chars", len(prompt or "") + sum(len(str(m.get("content", ""))) for m in messages or []))
+        if not cached and self.history:
+            usage = self.history[-1].get("usage") or {}
+            record("prompt_tokens", usage.get("prompt_tokens", 0) or 0)
+            record("completion_tokens", usage.get("completion_tokens", 0) or 0)
+
+    def __call__(self, prompt=None, messages=None, **kwargs):
+        start = time.perf_counter()
+        key = self._cache_key(prompt, messages, kwargs)
+        outputs = self._lookup(key)
+        cached = outputs is not None
+        if not cached:
+            if self._slots is None:
+                outputs = super().__call__(prompt=prompt, messages=messages, **kwargs)
+            else:
+                with self._slots:
+                    outputs = super().__call__(prompt=prompt, messages=messages, **kwargs)
+            self.response_cache.put(key, outputs)
+        self._record_call(prompt, messages, start, cached)
+        return outputs
+
+    def _loop_slots(self):
+        # asyncio semaphores belong to one event loop; every asyncio.run() gets a fresh one
+        loop = asyncio.get_running_loop()
+        if self._async_slots is None or self._async_slots[0] is not loop:
+            self._async_slots = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._async_slots[1]
+
+    async def acall(self, prompt=None, messages=None, **kwargs):
+        start = time.perf_counter()
+        key = self._cache_key(prompt, messages, kwargs)
+        outputs = self._lookup(key)
+        cached = outputs is not None
+        if not cached:
+            bind_async_session()
+            if self.max_concurrency is None:
+                outputs = await super().acall(prompt=prompt, messages=messages, **kwargs)
+            else:
+                async with self._loop_slots():
+                    outputs = await super().acall(prompt=prompt, messages=messages, **kwargs)
+            self.response_cache.put(key, outputs)
+        self._record_call(prompt, messages, start, cached)
+        return outputs
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import threading
+
+DEFAULT_MODEL = "gpt-4o-mini"
+FAKE_MODEL = "fake/stand-in"
+
+_lm = None
+_lock = threading.Lock()
+# (limits, timeout) of the shared HTTP pool, and the (event loop, AsyncClient) currently handed to litellm
+_http_pool = None
+_async_session = None
+
+
+def lm_config(config=None):
+    return (config or {}).get("lm") or {}
+
+
+def configured_model(config=None):
+    if os.getenv("LLM_FAKE") == "1":
+        return FAKE_MODEL
+    return lm_config(config).get("model", DEFAULT_MODEL)
+
+
+def backoff_settings(config=None):
+    """
+    Rate-limit backoff of the async agent loop, as acall_with_backoff kwargs.
+    LiteLLM already retries failed requests `num_retries` times, so the
+    backoff only retries when that is 0 or the fake LM (no LiteLLM) is used.
+    """
+    settings = lm_config(config)
+    litellm_retries = os.getenv("LLM_FAKE") != "1" and settings.get("num_retries") != 0
+    return dict(
+        max_retries=0 if litellm_retries else settings.get("rate_limit_retries", 5),
+        base_delay=settings.get("backoff_base_delay", 1.0),
+        max_delay=settings.get("backoff_max_delay", 30.0)
+    )
+
+
+def configure_http_pool(settings):
+    """
+    Shares one keep-alive HTTP connection pool between every LM request of
+    this process instead of letting each client open its own. Sync requests
+    use one Client; async requests use an AsyncClient per event loop, see
+    bind_async_session().
+    """
+    global _http_pool
+    import httpx
+    import litellm
+
+    limits = httpx.Limits(
+        max_connections=settings.get("max_connections", 20),
+        max_keepalive_connections=settings.get("max_keepalive_connections", 20),
+        keepalive_expiry=settings.get("keepalive_expiry", 60)
+    )
+    timeout = httpx.Timeout(settings.get("timeout", 60), connect=settings.get("connect_timeout", 10))
+    litellm.client_session = httpx.Client(limits=limits, timeout=timeout)
+    _http_pool = (limits, timeout)
+
+
+def bind_async_session():
+    """
+    Points litellm at the pooled AsyncClient of the running event loop.
+    An AsyncClient's connections belong to the loop that opened them and
+    every asyncio.run() starts a new loop, so a new loop gets a new client.
+    """
+    global _async_session
+    if _http_pool is None:
+        return
+    loop = asyncio.get_running_loop()
+    if _async_session is not None and _async_session[0] is loop:
+        return
+
+    import httpx
+    import litellm
+
+    limits, timeout = _http_pool
+    _async_session = (loop, httpx.AsyncClient(limits=limits, timeout=timeout))
+    litellm.aclient_session = _async_session[1]
+    # litellm keeps provider clients built around the previous session
+    clients = getattr(litellm, "in_memory_llm_clients_cache", None)
+    if clients is not None and hasattr(clients, "flush_cache"):
+        clients.flush_cache()
+
+
+async def close_async_session():
+    # Closes the running loop's AsyncClient while the loop can still await it
+    global _async_session
+    if _async_session is None or _async_session[0] is not asyncio.get_running_loop():
+        return
+    import litellm
+
+    client = _async_session[1]
+    _async_session = None
+    litellm.aclient_session = None
+    await client.aclose()
+
+
+def build_lm(config=None):
+    # DSPy, dotenv and the cache are only imported once an agent actually needs an LM
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    settings = lm_config(config)
+    # Responses are cached on disk; LLM_CACHE_REPLAY=1 serves only cached responses (no API calls)
+    cache_options = dict(
+        cache_path=os.getenv('LLM_CACHE_PATH', '.cache/llm_cache.sqlite'),
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '100000')),
+        replay_only=os.getenv('LLM_CACHE_REPLAY') == '1',
+        max_concurrency=settings.get("max_concurrency")
+    )
+    if os.getenv('LLM_FAKE') == '1':
+        # Deterministic in-process stand-in for load tests without an API key
+        from utils.fake_llm import CachedFakeLM
+        return CachedFakeLM(
+            FAKE_MODEL,
+            latency=float(os.getenv('LLM_FAKE_LATENCY', '0.5')),
+            error_rate=float(os.getenv('LLM_FAKE_ERROR_RATE', '0')),
+            rate_limit_rate=float(os.getenv('LLM_FAKE_RATE_LIMIT_RATE', '0')),
+            seed=int(os.getenv('LLM_FAKE_SEED', '0')),
+            **cache_options
+        )
+
+    from utils.llm_cache import CachedLM
+
+    configure_http_pool(settings)
+    lm_kwargs = {}
+    if settings.get("api_base"):
+        lm_kwargs["api_base"] = settings["api_base"]
+    if settings.get("timeout") is not None:
+        lm_kwargs["timeout"] = settings["timeout"]
+    if settings.get("num_retries") is not None:
+        lm_kwargs["num_retries"] = settings["num_retries"]
+    return CachedLM(
+        model=configured_model(config),
+        api_key=os.getenv(settings.get("api_key_env", "OPENAI_API_KEY")),
+        **lm_kwargs,
+        **cache_options
+    )
+
+
+def get_lm(config=None):
+    """Builds the LM from the config's `lm` section and configures DSPy with it on first use; later calls return the same LM."""
+    global _lm
+    with _lock:
+        if _lm is None:
+            import dspy
+
+            _lm = build_lm(config)
+            dspy.configure(lm=_lm)
+        return _lm
+
+
+def current_lm():
+    # None until some episode in this process has needed the LM
+    return _lm
@@ -0,0 +1,87 @@
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("episode_metrics", default=None)
+
+
+class EpisodeMetrics:
+    """
+    Per-step counters and timings of one episode.
+
+    The episode loop calls `start_step()` each step and times its own phases;
+    code further down (the LM wrapper, the agents) reports into whichever
+    EpisodeMetrics is active in the current context through `record()`, so
+    concurrent episodes on threads or asyncio tasks stay separate.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self._start = time.perf_counter()
+        self.wall_s = 0.0
+
+    def start_step(self):
+        self.steps.append({})
+
+    def add(self, key, value):
+        if not self.steps:
+            self.start_step()
+        step = self.steps[-1]
+        step[key] = step.get(key, 0) + value
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def timed(self, key):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(key, time.perf_counter() - start)
+
+    def finish(self):
+        self.wall_s = time.perf_counter() - self._start
+
+    def totals(self):
+        totals = {}
+        for step in self.steps:
+            for key, value in step.items():
+                totals[key] = totals.get(key, 0) + value
+        totals["wall_s"] = self.wall_s
+        return {key: round(value, 4) if isinstance(value, float) else value for key, value in totals.items()}
+
+
+def record(key, value):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(key, value)
+
+
+def append_step_metrics(path, job_id, steps):
+    if not steps:
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        for step_number, step in enumerate(steps):
+            f.write(json.dumps({"job_id": job_id, "step": step_number, **step}) + "\n")
+
+
+def to_prometheus(df, prefix="alfworld_benchmark"):
+    """Per-agent sums of every numeric metric column, in Prometheus text exposition format."""
+    lines = []
+    numeric = [c for c in df.columns if c not in ("agent_type",) and df[c].dtype.kind in "if"]
+    for column in numeric:
+        name = f"{prefix}_{column}_total"
+        lines.append(f"# TYPE {name} counter")
+        for agent_type, value in df.groupby("agent_type")[column].sum().items():
+            lines.append(f'{name}{{agent="{agent_type}"}} {value}')
+    return "\n".join(lines) + "\n"
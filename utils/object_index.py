@@ -0,0 +1,46 @@
+import json
+import os
+import re
+
+
+class ObjectIndex:
+    """
+    Compiled matcher for the objects of one extra_attributes file.
+
+    ALFWorld writes object names as lowercase tokens ("butterknife 1",
+    "houseplant 2"), so each key is matched case-insensitively as a whole
+    word. Longer names come first in the alternation, which keeps "Knife"
+    from matching inside "butterknife" and "Cup" inside "cupboard". One
+    `finditer` pass over the observation finds every object.
+    """
+
+    def __init__(self, extra_attributes):
+        self.attributes = extra_attributes
+        self._by_token = {key.lower(): key for key in extra_attributes}
+        tokens = sorted(self._by_token, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(" + "|".join(map(re.escape, tokens)) + r")\b", re.IGNORECASE) if tokens else None
+
+    def find(self, observation):
+        if self._pattern is None:
+            return []
+        keys = []
+        for match in self._pattern.finditer(observation):
+            key = self._by_token[match.group(1).lower()]
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    def description(self, key):
+        return self.attributes[key]["description"]
+
+
+_index_cache = {}
+
+
+def load_object_index(path):
+    # Built once per attribute file; a changed file (new mtime) is re-indexed
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _index_cache:
+        with open(path) as f:
+            _index_cache[key] = ObjectIndex(json.load(f))
+    return _index_cache[key]
@@ -0,0 +1,40 @@
+from utils.spatial_map import SpatialMap
+
+
+class ExplorationPlanner:
+    """
+    Chooses the trivially determined moves of an episode so the agent is
+    only consulted at decision points.
+
+    A closed receptacle the agent just walked to is opened without asking.
+    Otherwise the agent is asked whenever the last step turned up new
+    attribute objects (or at the start); in between, the planner walks to the
+    next unvisited receptacle of the frontier, in the order the room listing
+    named them.
+    """
+
+    def __init__(self):
+        self.world = SpatialMap()
+        self.decision_pending = True
+
+    def update(self, observation, action=None, new_objects=()):
+        self.world.update(observation, action)
+        if new_objects:
+            self.decision_pending = True
+
+    def next_action(self, admissible_commands):
+        commands = set(admissible_commands)
+        location = self.world.location
+        if location is not None:
+            receptacle = self.world.receptacles[location]
+            if receptacle.state == "closed" and receptacle.contents is None and f"open {location}" in commands:
+                return f"open {location}"
+
+        if self.decision_pending:
+            self.decision_pending = False
+            return None
+
+        for name, receptacle in self.world.receptacles.items():
+            if name in self.world.frontier and not receptacle.visited and f"go to {name}" in commands:
+                return f"go to {name}"
+        return None
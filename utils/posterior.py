@@ -0,0 +1,83 @@
+import math
+import re
+
+GROUND_TRUTH_LABELS = ["professor", "assassin", "student", "billionaire"]
+
+# Generic cue words per profession; each hit adds `weight` to that label's log-likelihood.
+# Written from common stereotypes of each profession, not from eval_attributes/: words taken from the
+# evaluated object descriptions would leak the test labels into the early stop, so never add them here.
+KEYWORD_LEXICON = {
+    "professor": [
+        "academic", "university", "faculty", "lecture", "lectures", "research", "paper", "papers", "journal",
+        "journals", "manuscript", "thesis", "citation", "conference", "syllabus", "grading", "book", "books",
+        "bookshelf", "library", "blackboard", "whiteboard", "chalk", "tweed", "reading glasses",
+    ],
+    "assassin": [
+        "weapon", "weapons", "gun", "pistol", "rifle", "knife", "blade", "silencer", "suppressor", "ammunition",
+        "bullet", "bullets", "poison", "toxin", "syringe", "garrote", "disguise", "passport", "burner phone",
+        "surveillance", "binoculars", "lockpick", "concealed", "untraceable", "target",
+    ],
+    "student": [
+        "homework", "assignment", "assignments", "textbook", "textbooks", "notebook", "backpack", "dorm", "campus",
+        "semester", "tuition", "student loan", "flashcards", "highlighter", "ramen", "instant noodles", "pizza",
+        "beer", "energy drink", "video game", "gaming", "secondhand", "cheap", "roommate", "exam",
+    ],
+    "billionaire": [
+        "luxury", "gold", "diamond", "diamonds", "platinum", "designer", "bespoke", "cashmere", "silk", "marble",
+        "crystal", "champagne", "caviar", "yacht", "private jet", "chauffeur", "penthouse", "mansion", "antique",
+        "vintage", "limited edition", "expensive", "priceless", "art collection", "investment",
+    ],
+}
+
+
+def _compile(words):
+    return re.compile("|".join(
+        re.escape(w) if not w[0].isalnum() else r"\b" + re.escape(w) + r"\b" for w in sorted(words, key=len, reverse=True)
+    ), re.IGNORECASE)
+
+
+_PATTERNS = {label: _compile(words) for label, words in KEYWORD_LEXICON.items()}
+
+
+def description_log_likelihoods(description, weight=1.0):
+    return {label: weight * len(pattern.findall(description)) for label, pattern in _PATTERNS.items()}
+
+
+class EvidencePosterior:
+    """
+    Running posterior over GROUND_TRUTH_LABELS from discovered object
+    descriptions, using keyword log-likelihoods and a uniform prior.
+
+    `decisive()` is true once at least `min_evidence` descriptions have been
+    seen and the top label's probability reaches `threshold`; the episode can
+    then stop without asking the LLM again.
+    """
+
+    def __init__(self, threshold=0.9, min_evidence=3, weight=1.0):
+        self.threshold = threshold
+        self.min_evidence = min_evidence
+        self.weight = weight
+        self.evidence = 0
+        self.log_scores = {label: 0.0 for label in GROUND_TRUTH_LABELS}
+        self._cache = {}
+
+    def observe(self, description):
+        if description not in self._cache:
+            self._cache[description] = description_log_likelihoods(description, self.weight)
+        for label, score in self._cache[description].items():
+            self.log_scores[label] += score
+        self.evidence += 1
+
+    def probabilities(self):
+        top = max(self.log_scores.values())
+        exp = {label: math.exp(score - top) for label, score in self.log_scores.items()}
+        total = sum(exp.values())
+        return {label: value / total for label, value in exp.items()}
+
+    def best(self):
+        probs = self.probabilities()
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def decisive(self):
+        return self.evidence >= self.min_evidence and self.best()[1] >= self.threshold
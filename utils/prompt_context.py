@@ -0,0 +1,61 @@
+import re
+from collections import deque
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a chars/4 estimate
+    _encoding = None
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def summarize(text, max_chars=120):
+    # Keep the label and the first sentence, e.g. "OBSERVED: You arrive at cabinet 3."
+    first = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    return first if len(first) <= max_chars else first[:max_chars - 3] + "..."
+
+
+class ContextBuffer:
+    """
+    Ring buffer of prompt entries with a token budget.
+
+    Each entry's token count and one-line summary are computed once on
+    append. `render()` walks back from the newest entry, keeping entries
+    verbatim while they fit and switching to their summaries once the budget
+    gets tight; whatever is kept is emitted in chronological order.
+    """
+
+    def __init__(self, max_entries=20, token_budget=1024):
+        self.token_budget = token_budget
+        self._entries = deque(maxlen=max_entries)
+
+    def append(self, text):
+        summary = summarize(text)
+        self._entries.append((text, count_tokens(text), summary, count_tokens(summary)))
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self):
+        remaining = self.token_budget
+        kept = []
+        full = True
+        for text, tokens, summary, summary_tokens in reversed(self._entries):
+            if full and tokens <= remaining:
+                kept.append(text)
+                remaining -= tokens
+                continue
+            full = False
+            if summary_tokens > remaining:
+                break
+            kept.append(summary)
+            remaining -= summary_tokens
+        return "\n".join(reversed(kept))
@@ -0,0 +1,59 @@
+import json
+import os
+
+
+class ResultStore:
+    """
+    Append-only JSONL file of episode results, keyed by `job_id`.
+
+    Every result is flushed and fsynced as soon as its episode finishes, so a
+    crash or hang loses at most the episode in flight. A torn last line from
+    a crash mid-write is ignored on load. Later rows for the same job_id win.
+
+    Per-step metrics of the same episodes go to `steps_path` next to it,
+    which starts over together with the results when not resuming.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.steps_path = os.path.splitext(path)[0] + "_steps.jsonl"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not resume:
+            for stale in (path, self.steps_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self._results = self._load()
+
+    def _load(self):
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[result["job_id"]] = result
+        return results
+
+    def __contains__(self, job_id):
+        return job_id in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+    def append(self, result):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(result, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._results[result["job_id"]] = result
+
+    def results(self, agent_type=None):
+        return [r for r in self._results.values() if agent_type is None or r["agent_type"] == agent_type]
+
+    def pending(self, jobs):
+        # Episodes that failed (e.g. simulator timeouts) are retried on resume
+        return [job for job in jobs if job["job_id"] not in self._results or self._results[job["job_id"]].get("error")]
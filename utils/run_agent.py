@@ -1,18 +1,16 @@
 import json
+import os
 import re
 import random
+import sys
 
 import alfworld.agents.modules.generic as generic
 from alfworld.agents.environment import get_environment
 import agents as agents
 
-import dspy
-import os
-from dotenv import load_dotenv
-load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
-lm = dspy.LM(model='gpt-4o-mini', api_key=api_key)
-dspy.configure(lm=lm)
+# Run as `python utils/run_agent.py`: the repo root goes last so `agents` above stays this folder's agents.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.lm_setup import get_lm
 
 def restrict_environment(env, number: int = 1, mode: str = 'scene'):
     if hasattr(env, "json_file_list"):
@@ -48,6 +46,7 @@ with open("extra_attributes.json") as f:
 
 # Set up environment
 config = generic.load_config()
+get_lm(config)  # model, endpoint, timeouts and retries come from the config's `lm` section
 env_type = config['env']['type']
 env = get_environment(env_type)(config, train_eval='train')
 env = env.init_env(batch_size=1)
@@ -0,0 +1,55 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+from utils.env_pool import EnvPool
+
+# Per-process state, set up once by _init_worker
+_worker_pool = None
+_worker_config = None
+
+
+def _init_worker(config):
+    global _worker_pool, _worker_config
+
+    # Importing eval is cheap; each worker builds its own DSPy LM when its first episode needs one
+    import eval  # noqa: F401
+
+    _worker_config = config
+    _worker_pool = EnvPool(config)
+    Finalize(None, _worker_pool.close_all, exitpriority=10)
+
+
+def _run_in_worker(job_fn, job, job_kwargs):
+    return job_fn(job, _worker_config, env_pool=_worker_pool, **job_kwargs)
+
+
+def open_worker_pool(config, workers=2):
+    """
+    Process pool whose workers each keep their own environment pool and DSPy
+    LM for every job submitted to it. Keep it open across rounds so workers
+    are only spawned, and their simulators started, once per benchmark.
+    Workers use the spawn start method to avoid inheriting THOR threads or
+    open LLM connections from the parent.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(config,))
+
+
+def run_jobs_parallel(job_fn, jobs, config, workers=2, executor=None, **job_kwargs):
+    """
+    Runs `job_fn(job, config, env_pool=..., **job_kwargs)` for every job on a
+    pool of worker processes and yields results as soon as they finish.
+
+    `job_fn` must be a module-level function. Pass an `executor` from
+    open_worker_pool to reuse its warm workers; otherwise a pool of
+    `workers` processes is opened for these jobs only.
+    """
+    if executor is None:
+        with open_worker_pool(config, workers) as executor:
+            yield from run_jobs_parallel(job_fn, jobs, config, executor=executor, **job_kwargs)
+        return
+
+    futures = {executor.submit(_run_in_worker, job_fn, job, job_kwargs): job for job in jobs}
+    for future in as_completed(futures):
+        yield future.result()
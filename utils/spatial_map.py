@@ -0,0 +1,132 @@
+import re
+
+_ITEM_SPLIT = re.compile(r",\s*(?:and\s+)?|\s+and\s+")
+_ROOM_LIST = re.compile(r"Looking quickly around you, you see (.*?)\.(?:\s|$)", re.IGNORECASE)
+_ARRIVE = re.compile(r"You arrive at (?:loc \d+\. )?(?:the )?([a-z]+ \d+)", re.IGNORECASE)
+_STATE = re.compile(r"The ([a-z]+ \d+) is (open|closed)", re.IGNORECASE)
+_ON = re.compile(r"On the ([a-z]+ \d+), you see (.*?)\.(?:\s|$)", re.IGNORECASE)
+_OPEN = re.compile(r"You open the ([a-z]+ \d+)", re.IGNORECASE)
+_CLOSE = re.compile(r"You close the ([a-z]+ \d+)", re.IGNORECASE)
+_IN_IT = re.compile(r"In it, you see (.*?)\.(?:\s|$)", re.IGNORECASE)
+_GO_TO = re.compile(r"go to ([a-z]+ \d+)", re.IGNORECASE)
+
+
+def parse_items(text):
+    if text.strip().lower() == "nothing":
+        return []
+    items = []
+    for item in _ITEM_SPLIT.split(text):
+        item = re.sub(r"^(?:a|an)\s+", "", item.strip())
+        if item:
+            items.append(item)
+    return items
+
+
+class Receptacle:
+    __slots__ = ("name", "visited", "state", "contents")
+
+    def __init__(self, name):
+        self.name = name
+        self.visited = False
+        self.state = None        # "open", "closed" or None for open surfaces
+        self.contents = None     # None until looked into / onto
+
+    @property
+    def explored(self):
+        return self.visited and self.contents is not None
+
+
+class SpatialMap:
+    """
+    World model of the receptacles in an ALFWorld room, built from the text
+    observations.
+
+    The first observation ("Looking quickly around you, you see a cabinet 1,
+    ...") seeds the receptacle list; later observations mark them visited,
+    open/closed and record their contents. `frontier` is the set of
+    receptacles whose contents are still unknown, kept up to date on every
+    update. `render()` emits only the frontier, the current location and the
+    discovered contents.
+    """
+
+    def __init__(self):
+        self.receptacles = {}
+        self.frontier = set()
+        self.location = None
+        self._touched = set()
+
+    def _get(self, name):
+        name = name.lower()
+        if name not in self.receptacles:
+            self.receptacles[name] = Receptacle(name)
+        self._touched.add(name)
+        return self.receptacles[name]
+
+    def _refresh(self, receptacle):
+        if receptacle.explored:
+            self.frontier.discard(receptacle.name)
+        else:
+            self.frontier.add(receptacle.name)
+
+    def update(self, observation, action=None):
+        room = _ROOM_LIST.search(observation)
+        if room:
+            for item in parse_items(room.group(1)):
+                self._get(item)
+
+        arrived = _ARRIVE.search(observation)
+        go_to = _GO_TO.match(action) if action else None
+        if arrived or (go_to and "arrive" in observation.lower()):
+            # THOR observations may say "You arrive at loc 3.", so trust the action's target first
+            self.location = (go_to.group(1) if go_to else arrived.group(1)).lower()
+            self._get(self.location).visited = True
+
+        for name, state in _STATE.findall(observation):
+            self._get(name).state = state.lower()
+
+        opened = _OPEN.search(observation)
+        if opened:
+            receptacle = self._get(opened.group(1))
+            receptacle.state = "open"
+            receptacle.visited = True
+            in_it = _IN_IT.search(observation)
+            if in_it:
+                receptacle.contents = parse_items(in_it.group(1))
+        elif self.location and self.receptacles[self.location].state == "open":
+            in_it = _IN_IT.search(observation)
+            if in_it:
+                self._get(self.location).contents = parse_items(in_it.group(1))
+
+        closed = _CLOSE.search(observation)
+        if closed:
+            self._get(closed.group(1)).state = "closed"
+
+        for name, items in _ON.findall(observation):
+            receptacle = self._get(name)
+            receptacle.visited = True
+            receptacle.contents = parse_items(items)
+
+        # Only receptacles mentioned in this observation can change frontier membership
+        for name in self._touched:
+            self._refresh(self.receptacles[name])
+        self._touched.clear()
+
+    def render(self):
+        lines = []
+        if self.location:
+            lines.append(f"Current location: {self.location}")
+
+        unvisited = sorted(name for name in self.frontier if not self.receptacles[name].visited)
+        unopened = sorted(name for name in self.frontier if self.receptacles[name].visited)
+        if unvisited:
+            lines.append("Unvisited: " + ", ".join(unvisited))
+        if unopened:
+            lines.append("Visited, contents unknown (closed): " + ", ".join(unopened))
+
+        found = [
+            f"{r.name}: {', '.join(r.contents) if r.contents else 'nothing'}"
+            for r in self.receptacles.values() if r.contents is not None
+        ]
+        if found:
+            lines.append("Contents: " + " | ".join(found))
+        return "\n".join(lines)
@@ -0,0 +1,107 @@
+import threading
+
+
+class SimulatorTimeout(RuntimeError):
+    def __init__(self, message, env=None):
+        super().__init__(message)
+        self.env = env
+
+
+def call_with_timeout(fn, *args, timeout=None, label="call"):
+    """
+    Runs `fn(*args)` on a daemon thread and waits at most `timeout` seconds.
+    On timeout the thread is abandoned (killing the simulator unblocks it)
+    and SimulatorTimeout is raised; exceptions from `fn` are re-raised.
+    """
+    if timeout is None:
+        return fn(*args)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name=f"watchdog-{label}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if thread.is_alive():
+        raise SimulatorTimeout(f"{label} did not finish within {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def psutil_available():
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def child_pids():
+    try:
+        import psutil
+    except ImportError:
+        return set()
+    return {p.pid for p in psutil.Process().children(recursive=True)}
+
+
+def kill_process_tree(pids):
+    """Force-kills `pids` and their descendants; unlike `kill_ai2thor` it never touches other processes."""
+    try:
+        import psutil
+    except ImportError:
+        print("⚠️ psutil is not installed, cannot kill the simulator processes")
+        return
+
+    procs = []
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            procs.extend(proc.children(recursive=True))
+            procs.append(proc)
+        except psutil.NoSuchProcess:
+            continue
+
+    for proc in procs:
+        try:
+            print(f"🔪 Killing simulator process {proc.pid} ({proc.name()})")
+            proc.kill()
+        except psutil.NoSuchProcess:
+            continue
+    psutil.wait_procs(procs, timeout=5)
+
+
+class WatchedEnv:
+    """
+    Wraps a batched ALFWorld env so `reset()` and `step()` raise
+    SimulatorTimeout instead of blocking forever on a stuck simulator.
+    `owned_pids` are the processes started when the env was built.
+    """
+
+    def __init__(self, env, reset_timeout=None, step_timeout=None, owned_pids=()):
+        self.env = env
+        self.reset_timeout = reset_timeout
+        self.step_timeout = step_timeout
+        self.owned_pids = set(owned_pids)
+
+    def reset(self):
+        return self._call(self.env.reset, timeout=self.reset_timeout, label="reset")
+
+    def step(self, actions):
+        return self._call(self.env.step, actions, timeout=self.step_timeout, label="step")
+
+    def _call(self, fn, *args, timeout, label):
+        try:
+            return call_with_timeout(fn, *args, timeout=timeout, label=f"env.{label}")
+        except SimulatorTimeout as e:
+            e.env = self
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)